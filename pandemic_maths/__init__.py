@@ -0,0 +1,20 @@
+"""
+Models to understand the pandemic.
+
+Modules are imported on demand, so importing the package is cheap and
+never pulls in a GUI toolkit:
+
+    vaccination_model   population, random cell spread and vaccination
+    metapop             regions linked by travel, sharded across processes
+    network             spread over a fixed contact network
+    ensemble            replicates of the vaccination model in parallel
+    cache               on-disk result cache and parameter sweeps
+    stochastic          Gillespie and tau-leaping S/I/R/V counts
+    ode                 S/I/R/V differential equations, doubling time, final size
+    growth              growth rate and doubling time fitted to case counts
+    virus_spread        bouncing ball model (virus_spread_arcade draws it)
+    events              event-driven engine for the bouncing ball model
+    infection_sim       Kivy bouncing ball model
+"""
+
+__version__ = '0.1.0'
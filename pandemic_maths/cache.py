@@ -0,0 +1,265 @@
+"""
+Persistent cache of model results, so a parameter sweep only runs the
+cells it has not run before.
+
+Results are numpy arrays in an SQLite database, keyed by the SHA-256 of
+the canonical JSON of the model name, its parameters, the seed and the
+code version, so a change to any of them is a miss.  The database is in
+WAL mode, so any number of processes can read it while one writes, and
+writers wait their turn.  When it outgrows max_bytes the least recently
+used results are evicted.
+"""
+
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import __version__, ensemble, vaccination_model
+
+
+def _code_version(*modules):
+    """The package version and a hash of the source of modules."""
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return '{}+{}'.format(__version__, digest.hexdigest()[:16])
+
+# Changes to the code of the models invalidate everything they computed.
+CODE_VERSION = _code_version(vaccination_model, ensemble)
+
+DEFAULT_PATH = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+                            'pandemic-maths', 'results.sqlite')
+
+
+def cache_key(model, params, seed, version=CODE_VERSION):
+    """
+    SHA-256 of the canonical JSON of everything a result depends on.
+    numpy scalars are taken as the Python numbers they hold.
+    """
+    text = json.dumps({'model': model, 'params': params, 'seed': seed, 'version': version},
+                      sort_keys=True, separators=(',', ':'), default=lambda value: value.item())
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _to_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _from_bytes(data):
+    return np.load(io.BytesIO(data), allow_pickle=False)
+
+
+class ResultCache:
+    """
+    Arrays by key in the SQLite database at path, at most max_bytes of
+    them.  Each process should open its own ResultCache.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=1 << 30):
+        self.path = path
+        self.max_bytes = max_bytes
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Transactions are begun explicitly, so writers lock the database
+        # before they read the sizes they evict by.
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS results '
+                         '(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def size(self):
+        """Bytes of results held."""
+        return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def get(self, key):
+        """The array stored under key, or None."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """{key: array} for those of keys that are cached."""
+        found = {}
+        keys = list(keys)
+        # SQLite limits the parameters to a statement.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start+500]
+            marks = ','.join('?' * len(chunk))
+            rows = self._db.execute('SELECT key, value FROM results WHERE key IN ({})'.format(marks), chunk)
+            found.update((key, _from_bytes(value)) for key, value in rows)
+        if found:
+            self._touch(list(found))
+        return found
+
+    def _touch(self, keys):
+        now = time.time()
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            self._db.executemany('UPDATE results SET used = ? WHERE key = ?', ((now, key) for key in keys))
+            self._db.execute('COMMIT')
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+
+    def put(self, key, array):
+        self.put_many({key: array})
+
+    def put_many(self, results):
+        """Store {key: array}, then evict down to max_bytes."""
+        now = time.time()
+        rows = [(key, _to_bytes(array)) for key, array in results.items()]
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            self._db.executemany('INSERT OR REPLACE INTO results (key, value, size, used) VALUES (?, ?, ?, ?)',
+                                 ((key, value, len(value), now) for key, value in rows))
+            self._evict()
+            self._db.execute('COMMIT')
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+
+    def _evict(self):
+        excess = self.size() - self.max_bytes
+        if excess <= 0:
+            return
+        doomed = []
+        for key, size in self._db.execute('SELECT key, size FROM results ORDER BY used'):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany('DELETE FROM results WHERE key = ?', doomed)
+
+
+def _run(task):
+    seed, params = task
+    return ensemble.run_replicate(seed, **params)
+
+
+def sweep(cache, grid, replicates=10, seed=0, workers=None, **fixed):
+    """
+    ensemble.run_replicate() for every combination of the values in grid,
+    a dict of parameter name to list of values, with the fixed parameters
+    and replicates random streams spawned from seed.  Only runs missing
+    from cache are computed, across a process pool as in ensemble, and
+    they are stored as they finish.  With seed None every run is fresh,
+    so the cache is neither read nor written.
+
+    Returns the counts, shape (one axis per grid parameter) +
+    (replicates, steps+1, len(Status)), and the number of runs computed.
+    """
+    names = list(grid)
+    cells = list(itertools.product(*grid.values()))
+    seeds = np.random.SeedSequence(seed).spawn(replicates)
+    keys = []
+    tasks = {}
+    for cell in cells:
+        params = dict(fixed, **dict(zip(names, cell)))
+        for replicate in range(replicates):
+            key = cache_key('SimpleModel', params, [seed, replicate])
+            keys.append(key)
+            tasks[key] = (seeds[replicate], params)
+    if seed is None:
+        # Fresh entropy each time: nothing to look up or reuse.
+        cache = None
+        results = {}
+    else:
+        results = cache.get_many(tasks)
+    missing = [key for key in tasks if key not in results]
+
+    workers = workers or os.cpu_count()
+    if missing:
+        if workers == 1 or len(missing) == 1:
+            done = map(_run, (tasks[key] for key in missing))
+            for key, counts in zip(missing, done):
+                if cache is not None:
+                    cache.put(key, counts)
+                results[key] = counts
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                chunksize = max(1, len(missing) // (4 * workers))
+                done = pool.map(_run, (tasks[key] for key in missing), chunksize=chunksize)
+                # Store a batch at a time, so an interrupted sweep keeps
+                # most of what it ran.
+                batch = {}
+                for key, counts in zip(missing, done):
+                    batch[key] = counts
+                    if len(batch) == 100:
+                        if cache is not None:
+                            cache.put_many(batch)
+                        results.update(batch)
+                        batch = {}
+                if cache is not None:
+                    cache.put_many(batch)
+                results.update(batch)
+
+    counts = np.stack([results[key] for key in keys])
+    shape = tuple(len(values) for values in grid.values()) + (replicates,)
+    return counts.reshape(shape + counts.shape[1:]), len(missing)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Sweep the vaccination model, with results cached on disk.')
+    parser.add_argument('--cell-size', type=int, nargs='+', default=[2, 3, 4])
+    parser.add_argument('--initial', type=int, nargs='+', default=[1], help='people infected at the start')
+    parser.add_argument('--vaccinated', type=float, nargs='+', default=[0.0, 0.2, 0.4],
+                        help='fractions vaccinated at the start')
+    parser.add_argument('--population', type=int, default=1000)
+    parser.add_argument('--steps', type=int, default=20)
+    parser.add_argument('--replicates', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0, help='master seed')
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    parser.add_argument('--cache', default=DEFAULT_PATH, help='database file')
+    parser.add_argument('--max-mb', type=float, default=1024, help='size the cache is kept under')
+    args = parser.parse_args(argv)
+    if min(args.cell_size) < 1:
+        parser.error('--cell-size must be at least 1')
+    if not 0 <= min(args.vaccinated) <= max(args.vaccinated) <= 1:
+        parser.error('--vaccinated must be between 0 and 1')
+    if not 0 <= min(args.initial) <= max(args.initial) <= args.population - round(max(args.vaccinated) * args.population):
+        parser.error('--initial must be between 0 and the people left unvaccinated')
+
+    grid = {'cell_size': args.cell_size, 'initial': args.initial, 'vaccinated': args.vaccinated}
+    start = time.perf_counter()
+    with ResultCache(args.cache, int(args.max_mb * 2**20)) as cache:
+        counts, computed = sweep(cache, grid, args.replicates, args.seed, args.workers,
+                                 population_size=args.population, steps=args.steps)
+    elapsed = time.perf_counter() - start
+    print("{} runs, {} computed, in {:.3f}s".format(counts[..., 0, 0].size, computed, elapsed))
+
+    # Everyone not vulnerable or vaccinated at the end has been infected.
+    status = vaccination_model.Status
+    final = counts[..., -1, :]
+    infected = args.population - final[..., status.VULNERABLE.value] - final[..., status.VACCINATED.value]
+    median = np.median(infected, axis=-1)
+    print("Median people infected by step {}".format(args.steps))
+    print(*grid, "infected", sep='\t')
+    for index in itertools.product(*(range(len(values)) for values in grid.values())):
+        print(*(values[i] for values, i in zip(grid.values(), index)), '{:g}'.format(median[index]), sep='\t')
+
+
+if __name__ == '__main__':
+    main()
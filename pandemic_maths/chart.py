@@ -0,0 +1,88 @@
+"""
+Fixed-size history of a run for charting, however long the run goes on.
+"""
+
+import numpy as np
+
+
+class Chart:
+    """
+    The history of `series` values squeezed into at most `columns`
+    columns, which must be even.  Each column keeps the minimum and
+    maximum of the samples it covers.  When every column is full,
+    neighbouring pairs merge, so each column covers twice as many
+    samples and half the columns are free again.  Memory is fixed, and
+    appending a sample is O(1) apart from the occasional merge.
+
+    dirty is the first column changed since a renderer last called
+    changed(), so a renderer only has to re-send those columns.
+    """
+
+    def __init__(self, columns=600, series=1):
+        assert columns % 2 == 0
+        self.columns = columns
+        self.low = np.zeros((series, columns), dtype=np.float32)
+        self.high = np.zeros((series, columns), dtype=np.float32)
+        self.used = 0
+        self.per_column = 1
+        self._in_column = 0
+        self.dirty = 0
+        self.last = None
+
+    def append(self, values):
+        values = np.asarray(values, dtype=np.float32)
+        self.last = values
+        if self.used and self._in_column < self.per_column:
+            column = self.used - 1
+            np.minimum(self.low[:, column], values, out=self.low[:, column])
+            np.maximum(self.high[:, column], values, out=self.high[:, column])
+            self._in_column += 1
+        else:
+            if self.used == self.columns:
+                self._merge()
+            column = self.used
+            self.low[:, column] = values
+            self.high[:, column] = values
+            self.used += 1
+            self._in_column = 1
+        self.dirty = min(self.dirty, column)
+
+    def _merge(self):
+        half = self.columns // 2
+        self.low[:, :half] = np.minimum(self.low[:, 0::2], self.low[:, 1::2])
+        self.high[:, :half] = np.maximum(self.high[:, 0::2], self.high[:, 1::2])
+        self.used = half
+        self.per_column *= 2
+        self.dirty = 0
+
+    def state(self):
+        return {'low': self.low.copy(), 'high': self.high.copy(), 'used': self.used,
+                'per_column': self.per_column, 'in_column': self._in_column,
+                'last': None if self.last is None else self.last.tolist()}
+
+    def restore(self, state):
+        """Go back to a state(); every column is dirty."""
+        self.low[:] = state['low']
+        self.high[:] = state['high']
+        self.used = state['used']
+        self.per_column = state['per_column']
+        self._in_column = state['in_column']
+        self.last = None if state['last'] is None else np.array(state['last'], dtype=np.float32)
+        self.dirty = 0
+
+    def changed(self):
+        """The columns changed since the last call, as (first, end)."""
+        first = self.dirty
+        self.dirty = self.used
+        return first, self.used
+
+    def vertices(self, series, first, end):
+        """
+        Two (column, value) vertices per column, low then high, for
+        drawing as a line strip.
+        """
+        vertices = np.empty((end - first, 2, 2), dtype=np.float32)
+        vertices[:, :, 0] = np.arange(first, end)[:, None]
+        vertices[:, 0, 1] = self.low[series, first:end]
+        vertices[:, 1, 1] = self.high[series, first:end]
+        return vertices
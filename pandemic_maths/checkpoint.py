@@ -0,0 +1,119 @@
+"""
+Checkpoints of a run's full state, so a long run that stops can carry on
+where it left off, with the same results as if it had never stopped.
+
+A state is a dict, possibly nested, of numpy arrays and JSON values such
+as step counters and random number generator states, as returned by the
+state() methods of the models.  save() writes it as an uncompressed npz
+file: each array under its dotted path of keys, and everything else as
+JSON under META.  The file is written beside the checkpoint and renamed
+over it, so a checkpoint is always either the old one or the new one,
+never half written.  Checkpointer does the writing in a background
+thread, every so many steps.
+"""
+
+import json
+import os
+import queue
+import secrets
+import threading
+
+import numpy as np
+
+META = '__meta__'
+
+
+def _flatten(state, prefix, arrays, meta):
+    for key, value in state.items():
+        path = prefix + key
+        if isinstance(value, dict):
+            _flatten(value, path + '.', arrays, meta)
+        elif isinstance(value, np.ndarray):
+            arrays[path] = value
+        else:
+            meta[path] = value
+
+
+def _unflatten(items):
+    state = {}
+    for path, value in items:
+        *parents, key = path.split('.')
+        node = state
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = value
+    return state
+
+
+def save(path, state):
+    """Write state to path atomically."""
+    arrays = {}
+    meta = {}
+    _flatten(state, '', arrays, meta)
+    arrays[META] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+    directory, name = os.path.split(os.path.abspath(path))
+    # Not mkstemp, which makes the file private: created like this it
+    # gets the mode the umask gives any new file.
+    temp = os.path.join(directory, '{}.{}.tmp'.format(name, secrets.token_hex(8)))
+    fd = os.open(temp, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def load(path):
+    """The state saved at path."""
+    with np.load(path, allow_pickle=False) as data:
+        items = [(key, data[key]) for key in data.files if key != META]
+        meta = json.loads(bytes(data[META]).decode('utf-8'))
+    return _unflatten(items + list(meta.items()))
+
+
+class Checkpointer:
+    """
+    Saves a state to path every `every` steps, in a background thread.
+    maybe() takes a function returning the state, which is only called
+    when a checkpoint is due; the state must be a copy, as the run goes
+    on while it is written.  At most one checkpoint waits to be written,
+    and close() waits for the last.
+    """
+
+    def __init__(self, path, every=100):
+        self.path = path
+        self.every = every
+        self._queue = queue.Queue(maxsize=1)
+        self._error = None
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def _write(self):
+        while True:
+            state = self._queue.get()
+            if state is None:
+                break
+            try:
+                save(self.path, state)
+            except Exception as e:
+                self._error = e
+
+    def maybe(self, step, get_state):
+        """Checkpoint get_state() if step is a multiple of every."""
+        if step % self.every == 0:
+            self.save(get_state())
+
+    def save(self, state):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(state)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,43 @@
+"""
+pandemic-maths run <model> [options]
+
+Only the chosen model is imported, so headless models start without
+loading a GUI toolkit.  Options after the model name go to that model;
+try `pandemic-maths run <model> --help`.
+"""
+
+import argparse
+import importlib
+
+# name: (module, help).  Each module has a main(argv, prog), prog being
+# the name its usage is shown under.
+MODELS = {
+    'vaccination': ('vaccination_model', 'random cell spread with a vaccination campaign (text)'),
+    'metapop': ('metapop', 'regions linked by travel, one process per shard of regions (text)'),
+    'network': ('network', 'spread through households and workplaces (text)'),
+    'ensemble': ('ensemble', 'percentile bands over many vaccination model runs (text)'),
+    'stochastic': ('stochastic', 'S/I/R/V counts for millions, Gillespie or tau-leaping (text)'),
+    'ode': ('ode', 'S/I/R/V equations swept over R0 and vaccination rates (text)'),
+    'sweep': ('cache', 'vaccination model over a parameter grid, cached on disk (text)'),
+    'balls': ('virus_spread', 'bouncing balls without a window (text)'),
+    'virus-spread': ('virus_spread_arcade', 'bouncing balls (arcade window)'),
+    'infection': ('infection_sim', 'bouncing balls (Kivy window)'),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='pandemic-maths', description='Maths to understand the pandemic.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='run a model',
+                              description='\n'.join('{:14}{}'.format(k, v[1]) for k, v in MODELS.items()),
+                              formatter_class=argparse.RawDescriptionHelpFormatter)
+    run.add_argument('model', choices=MODELS)
+    run.add_argument('args', nargs=argparse.REMAINDER, help='options for the model')
+    args = parser.parse_args(argv)
+
+    module = importlib.import_module('.' + MODELS[args.model][0], __package__)
+    module.main(args.args, '{} run {}'.format(parser.prog, args.model))
+
+
+if __name__ == '__main__':
+    main()
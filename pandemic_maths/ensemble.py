@@ -0,0 +1,100 @@
+"""
+Run many replicates of SimpleModel across a process pool and summarise
+them as per-step percentile bands of the S/I/R/V counts.
+
+Every replicate gets its own random stream, spawned from a master seed,
+so results are bit-identical for the same seed whatever the number of
+workers.
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from .vaccination_model import Population, SimpleModel, Status
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def run_replicate(seed, population_size=1000, cell_size=3, steps=10, initial=1, vaccinated=0.0):
+    """
+    One run of SimpleModel, with a fraction of the population vaccinated
+    before the first infections.  Returns the count of people in each
+    Status (columns in Status value order) before spreading and after
+    every step.
+    """
+    pop = Population(population_size)
+    model = SimpleModel(pop, np.random.default_rng(seed))
+    counts = np.empty((steps+1, len(Status)), dtype=np.int64)
+    if vaccinated:
+        model.vaccinate(vaccinated)
+    model.infect(initial)
+    counts[0] = [pop.count_status(s) for s in Status]
+    for step in range(steps):
+        model.spread(cell_size)
+        counts[step+1] = [pop.count_status(s) for s in Status]
+    return counts
+
+
+def run_replicates(replicates=100, seed=None, workers=None, **kwargs):
+    """
+    Counts from every replicate, shape (replicates, steps+1, len(Status)).
+    kwargs are passed on to run_replicate.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(replicates)
+    run = partial(run_replicate, **kwargs)
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        return np.stack([run(s) for s in seeds])
+    with ProcessPoolExecutor(workers) as pool:
+        chunksize = max(1, replicates // (4 * workers))
+        return np.stack(list(pool.map(run, seeds, chunksize=chunksize)))
+
+
+def run_ensemble(replicates=100, seed=None, workers=None, percentiles=PERCENTILES, **kwargs):
+    """
+    Percentile bands over replicates, shape
+    (len(percentiles), steps+1, len(Status)).
+    """
+    runs = run_replicates(replicates, seed, workers, **kwargs)
+    return np.percentile(runs, percentiles, axis=0)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--replicates', type=int, default=100)
+    parser.add_argument('--population', type=int, default=1000)
+    parser.add_argument('--cell-size', type=int, default=3)
+    parser.add_argument('--steps', type=int, default=10)
+    parser.add_argument('--initial', type=int, default=1, help='people infected at the start')
+    parser.add_argument('--vaccinated', type=float, default=0.0, help='fraction vaccinated at the start')
+    parser.add_argument('--seed', type=int, default=None, help='master seed')
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    args = parser.parse_args(argv)
+    if args.cell_size < 1:
+        parser.error('--cell-size must be at least 1')
+    if not 0 <= args.vaccinated <= 1:
+        parser.error('--vaccinated must be between 0 and 1')
+    if not 0 <= args.initial <= args.population - round(args.vaccinated * args.population):
+        parser.error('--initial must be between 0 and the people left unvaccinated')
+
+    seed = args.seed
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+        print("Seed", seed)
+    bands = run_ensemble(args.replicates, seed, args.workers,
+                         population_size=args.population, cell_size=args.cell_size,
+                         steps=args.steps, initial=args.initial, vaccinated=args.vaccinated)
+
+    print("Percentiles", '/'.join(map(str, PERCENTILES)))
+    print("step", *(s.name.lower() for s in Status), sep='\t')
+    for step in range(args.steps+1):
+        cols = ['/'.join('{:g}'.format(v) for v in bands[:, step, s.value]) for s in Status]
+        print(step, *cols, sep='\t')
+
+
+if __name__ == '__main__':
+    main()
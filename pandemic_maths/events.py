@@ -0,0 +1,208 @@
+"""
+Event-driven engine for the bouncing ball model.
+
+Rather than moving every ball a step at a time and testing for overlaps,
+EventWorld works out exactly when the next ball hits a wall or another
+ball, and jumps straight there.  Nothing can pass through anything else
+however fast it goes, and time where nothing happens costs nothing.
+"""
+
+import heapq
+import math
+from itertools import count
+
+import numpy as np
+
+from .virus_spread import BallWorld, INFECTIOUS_STEPS
+
+# Kinds of event.
+WALL_X = 0
+WALL_Y = 1
+BALL = 2
+RECOVER = 3
+
+
+class EventWorld(BallWorld):
+    """
+    A BallWorld stepped from event to event.  Time is in steps, so
+    step(n) runs every event in the next n steps and leaves the balls
+    where they are at the end, and the window can draw either engine.
+
+    Two balls meet when their centres are the mean of their sizes apart,
+    in any direction, and then swap velocities and infect each other
+    just as in BallWorld.contact().  That is not quite the fixed-step
+    engine's rule, which counts balls as in contact when they are within
+    size of each other on both axes, a square rather than a circle, so
+    the two engines give statistically similar runs, not the same ones.
+    Balls bounce off the walls at their size from the edge.
+
+    Between events a ball is only moved when it takes part in one: x, y
+    is where it was at time t0.  Each ball has one event in the queue,
+    the soonest it will take part in, tagged with the count of velocity
+    changes of the balls involved.  An event whose balls have changed
+    velocity since is stale: it is dropped, and its ball's next event
+    worked out again.
+    """
+
+    def __init__(self, size=100, infected=1, *args, **kwargs):
+        # BallWorld infects the first balls as it starts, which queues
+        # their recovery.
+        self.time = 0.0
+        self.events = 0
+        self._queue = []
+        self._seq = count()
+        self.recover_at = np.full(size, math.inf)
+        self.changes = None
+        super().__init__(size, infected, *args, **kwargs)
+        self.t0 = np.zeros(size)
+        self.changes = np.zeros(size, dtype=np.int64)
+        for ball in range(size):
+            self._predict(ball)
+
+    def state(self):
+        state = super().state()
+        queue = self._queue
+        state.update(time=self.time, events=self.events, t0=self.t0.copy(),
+                     changes=self.changes.copy(), recover_at=self.recover_at.copy(),
+                     # The queue in heap order, times apart from the rest.
+                     queue_time=np.array([event[0] for event in queue]),
+                     queue=np.array([event[1:] for event in queue], dtype=np.int64).reshape(-1, 6),
+                     seq=next(self._seq))
+        self._seq = count(state['seq'])
+        return state
+
+    def restore(self, state):
+        super().restore(state)
+        self.time = state['time']
+        self.events = state['events']
+        self.t0 = state['t0'].copy()
+        self.changes = state['changes'].copy()
+        self.recover_at = state['recover_at'].copy()
+        self._queue = [(time,) + tuple(event) for time, event in
+                       zip(state['queue_time'].tolist(), state['queue'].tolist())]
+        self._seq = count(state['seq'])
+
+    def _push(self, time, kind, ball, other=-1):
+        ball_changes = self.changes[ball] if self.changes is not None else 0
+        other_changes = self.changes[other] if other >= 0 else 0
+        heapq.heappush(self._queue, (time, next(self._seq), kind, ball, other, ball_changes, other_changes))
+
+    def infect(self, index):
+        index = super().infect(index)
+        self.recover_at[index] = self.time + INFECTIOUS_STEPS
+        for ball in index.tolist():
+            self._push(self.time + INFECTIOUS_STEPS, RECOVER, ball)
+        return index
+
+    def speed(self, value, index=slice(None)):
+        super().speed(value, index)
+        if self.changes is not None:
+            self._sync()
+            for ball in np.arange(len(self))[index].tolist():
+                self.changes[ball] += 1
+                self._predict(ball)
+
+    def _move(self, ball):
+        """Bring one ball up to the current time."""
+        dt = self.time - self.t0[ball]
+        self.x[ball] += self.change_x[ball] * dt
+        self.y[ball] += self.change_y[ball] * dt
+        self.t0[ball] = self.time
+
+    def _sync(self):
+        """Bring every ball up to the current time."""
+        dt = self.time - self.t0
+        self.x += self.change_x * dt
+        self.y += self.change_y * dt
+        self.t0[:] = self.time
+
+    def _predict(self, ball):
+        """Queue the soonest wall or ball the ball, now up to date, will hit."""
+        x = self.x[ball]
+        y = self.y[ball]
+        vx = self.change_x[ball]
+        vy = self.change_y[ball]
+        size = self.size[ball]
+        soonest = math.inf
+        kind = other = None
+        if vx:
+            soonest = ((self.width - size if vx > 0 else size) - x) / vx
+            kind = WALL_X
+        if vy:
+            t = ((self.height - size if vy > 0 else size) - y) / vy
+            if t < soonest:
+                soonest = t
+                kind = WALL_Y
+        soonest = max(soonest, 0.0)
+
+        # Solve |p + v t| = reach for each other ball, with p and v its
+        # position and velocity relative to this one, taking the first
+        # root of those approaching.
+        dt = self.time - self.t0
+        px = self.x + self.change_x * dt - x
+        py = self.y + self.change_y * dt - y
+        dvx = self.change_x - vx
+        dvy = self.change_y - vy
+        reach = (self.size + size) / 2
+        b = px * dvx + py * dvy
+        vv = dvx * dvx + dvy * dvy
+        d = b * b - vv * (px * px + py * py - reach * reach)
+        meets = (b < 0) & (d >= 0)
+        meets[ball] = False
+        candidates = np.flatnonzero(meets)
+        if len(candidates):
+            b = b[candidates]
+            t = -(b + np.sqrt(d[candidates])) / vv[candidates]
+            # Balls already overlapping, from where they started, pass
+            # out of each other before they can meet.
+            t[t < 0] = math.inf
+            first = int(np.argmin(t))
+            if t[first] < soonest:
+                soonest = t[first]
+                kind = BALL
+                other = int(candidates[first])
+
+        if kind is not None:
+            self._push(self.time + soonest, kind, ball, -1 if other is None else other)
+
+    def step(self, n=1):
+        """ Every event in the next n steps """
+        end = self.steps + n
+        queue = self._queue
+        changes = self.changes
+        while queue and queue[0][0] <= end:
+            time, seq, kind, ball, other, ball_changes, other_changes = heapq.heappop(queue)
+            self.time = time
+            if kind == RECOVER:
+                self.immune(ball)
+                self.recover_at[ball] = math.inf
+                self.infectious[ball] = 0
+                continue
+            if changes[ball] != ball_changes:
+                # The ball's velocity changed and it was queued again then.
+                continue
+            self._move(ball)
+            if kind == BALL and changes[other] != other_changes:
+                # The other ball turned away first.
+                self._predict(ball)
+                continue
+            self.events += 1
+            changes[ball] += 1
+            if kind == WALL_X:
+                self.x[ball] = self.width - self.size[ball] if self.change_x[ball] > 0 else self.size[ball]
+                self.change_x[ball] *= -1
+            elif kind == WALL_Y:
+                self.y[ball] = self.height - self.size[ball] if self.change_y[ball] > 0 else self.size[ball]
+                self.change_y[ball] *= -1
+            else:
+                self._move(other)
+                changes[other] += 1
+                self.contact(ball, other)
+                self._predict(other)
+            self._predict(ball)
+
+        self.time = float(end)
+        self._sync()
+        self.steps = end
+        infectious = np.isfinite(self.recover_at)
+        self.infectious[infectious] = np.ceil(self.recover_at[infectious] - self.time)
@@ -0,0 +1,186 @@
+"""
+Growth rate and doubling time of case counts, fitted over a sliding
+window.
+
+While growth is exponential, log(count) is a straight line in time and
+its slope is the growth rate r, so doubling time is log(2) / r.
+fit_growth() fits that line by least squares over every window of every
+series at once: the sums the fit needs come from cumulative sums, so
+each window costs the same however wide it is.  StreamingGrowth keeps
+the same sums for the latest window as counts arrive, updating them in
+O(1).
+
+Counts of zero have no logarithm and are left out of the fits.  Rates
+come with a confidence interval from Student's t distribution.
+"""
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+
+def t_quantile(p, dof):
+    """
+    Quantile p of Student's t distribution with dof degrees of freedom,
+    exact for 1 to 4 and otherwise from the Cornish-Fisher expansion
+    about the normal quantile, good to 0.1% from 5 up for p between
+    0.005 and 0.995.
+    """
+    dof = np.asarray(dof, dtype=float)
+    z = NormalDist().inv_cdf(p)
+    terms = [(z**3 + z) / 4,
+             (5*z**5 + 16*z**3 + 3*z) / 96,
+             (3*z**7 + 19*z**5 + 17*z**3 - 15*z) / 384,
+             (79*z**9 + 776*z**7 + 1482*z**5 - 1920*z**3 - 945*z) / 92160]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = z + sum(term / dof**(k+1) for k, term in enumerate(terms))
+        t = np.where(dof == 4, _t4_quantile(p), t)
+        t = np.where(dof == 3, _t3_quantile(p, z + sum(term / 3**(k+1) for k, term in enumerate(terms))), t)
+        t = np.where(dof == 2, (2*p - 1) / math.sqrt(2 * p * (1 - p)), t)
+        t = np.where(dof == 1, math.tan(math.pi * (p - 0.5)), t)
+    return t
+
+
+def _t3_quantile(p, guess):
+    """
+    Quantile p of t with 3 degrees of freedom, whose CDF is
+    1/2 + (a + sin(a) cos(a)) / pi at t = sqrt(3) tan(a), by Newton's
+    method in a from the quantile guessed.
+    """
+    target = math.pi * (p - 0.5)
+    a = math.atan(guess / math.sqrt(3))
+    for i in range(6):
+        a -= (a + math.sin(a) * math.cos(a) - target) / (2 * math.cos(a)**2)
+    return math.sqrt(3) * math.tan(a)
+
+
+def _t4_quantile(p):
+    """Quantile p of t with 4 degrees of freedom, in closed form."""
+    if p == 0.5:
+        return 0.0
+    root = math.sqrt(4 * p * (1 - p))
+    q = math.cos(math.acos(root) / 3) / root
+    return math.copysign(2 * math.sqrt(q - 1), p - 0.5)
+
+
+def _fit(n, t, tt, y, yy, ty, confidence):
+    """
+    Slope and its confidence interval from the sums over each window of
+    1, t, t*t, y, y*y and t*y, for points at least three to a window.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stt = tt - t * t / n
+        sty = ty - t * y / n
+        syy = yy - y * y / n
+        rate = sty / stt
+        residual = np.maximum(syy - rate * sty, 0.0)
+        error = np.sqrt(residual / (n - 2) / stt)
+        half = t_quantile(0.5 + confidence / 2, n - 2) * error
+    rate = np.where(n >= 3, rate, np.nan)
+    return rate, rate - half, rate + half
+
+
+def fit_growth(counts, window=7, confidence=0.95):
+    """
+    Growth rate per time step over the window of counts ending at each
+    step, for every series.  counts has time on its last axis.  Returns
+    rate and the low and high ends of its confidence interval, each the
+    shape of counts, NaN where a window has fewer than three non-zero
+    counts (including the first window - 1 steps).
+    """
+    counts = np.asarray(counts, dtype=float)
+    present = counts > 0
+    with np.errstate(divide='ignore'):
+        y = np.where(present, np.log(counts), 0.0)
+    # Times are counted from the middle of the series to keep the sums
+    # small, and every sum is over present points only.
+    steps = counts.shape[-1]
+    t = np.where(present, np.arange(steps) - steps // 2, 0.0)
+    sums = []
+    for values in (present.astype(float), t, t * t, y, y * y, t * y):
+        total = np.cumsum(values, axis=-1)
+        windowed = total.copy()
+        windowed[..., window:] -= total[..., :-window]
+        windowed[..., :window-1] = np.nan
+        sums.append(windowed)
+    return _fit(*sums, confidence)
+
+
+def doubling_time(rate):
+    """log(2) / rate, infinite where the count is not growing."""
+    rate = np.asarray(rate, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(rate > 0, math.log(2) / rate, np.where(np.isnan(rate), np.nan, np.inf))
+
+
+class StreamingGrowth:
+    """
+    The growth fit over the latest window counts of one or more series,
+    updated in O(1) per series as each count arrives.  shape is the
+    shape of the counts given to update(), () for a single series.
+
+    The window's sums are kept with times counted from its first step,
+    so when it slides on a step the time sums are shifted rather than
+    recomputed, and they never grow with the length of the run.  Until
+    window counts have arrived, the fit is over those there are.
+    """
+
+    def __init__(self, window=7, shape=(), confidence=0.95):
+        self.window = window
+        self.confidence = confidence
+        self.shape = tuple(np.atleast_1d(shape)) if shape != () else ()
+        self._y = np.zeros((window,) + self.shape)
+        self._present = np.zeros((window,) + self.shape, dtype=bool)
+        self._sums = [np.zeros(self.shape) for i in range(6)]
+        self.steps = 0
+
+    def update(self, count):
+        """Add the next count of each series."""
+        count = np.asarray(count, dtype=float)
+        present = count > 0
+        with np.errstate(divide='ignore'):
+            y = np.where(present, np.log(np.where(present, count, 1.0)), 0.0)
+        n, t, tt, sy, yy, ty = self._sums
+        slot = self.steps % self.window
+        if self.steps >= self.window:
+            # Drop the oldest point, at time 0, then count times from the
+            # next one.
+            old = self._present[slot]
+            old_y = self._y[slot]
+            n = n - old
+            sy = sy - old_y
+            yy = yy - old_y * old_y
+            tt = tt - 2 * t + n
+            t = t - n
+            ty = ty - sy
+        # The new point is at time window - 1, or steps while filling.
+        at = min(self.steps, self.window - 1)
+        w = present.astype(float)
+        n = n + w
+        t = t + w * at
+        tt = tt + w * at * at
+        sy = sy + y
+        yy = yy + y * y
+        ty = ty + y * at
+        self._sums = [n, t, tt, sy, yy, ty]
+        self._y[slot] = y
+        self._present[slot] = present
+        self.steps += 1
+
+    def state(self):
+        return {'y': self._y.copy(), 'present': self._present.copy(),
+                'sums': np.stack(self._sums), 'steps': self.steps}
+
+    def restore(self, state):
+        self._y = state['y'].copy()
+        self._present = state['present'].copy()
+        self._sums = list(state['sums'].copy())
+        self.steps = state['steps']
+
+    def rate(self):
+        """Growth rate and its confidence interval, as in fit_growth()."""
+        return _fit(*self._sums, self.confidence)
+
+    def doubling_time(self):
+        return doubling_time(self.rate()[0])
@@ -0,0 +1,380 @@
+# A simple model of viral infection.
+# Bounce 100 balls and when an infected ball strikes another it is
+# infected.
+# A recovery time is set, and once recovered an infected subject can
+# no longer be infected or infect another.
+# Assumes no other consequence of infection, i.e. all infected will
+# recover and be immune forever.
+
+RECOVER_TIME = 4.0
+POPULATION_SIZE = 100
+REPORT_INTERVAL = 2.0
+# Each update is one tick of the simulation, whatever the frame rate.
+TICKS_PER_SECOND = 60
+RECOVER_TICKS = round(RECOVER_TIME * TICKS_PER_SECOND)
+REPORT_TICKS = round(REPORT_INTERVAL * TICKS_PER_SECOND)
+# People whose centres are this close are in contact.
+CONTACT_DISTANCE = 5
+
+import argparse
+import os
+import random
+from random import randint
+from random import choice as randchoice
+
+# Leave the command line to pandemic-maths rather than Kivy.
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from kivy.app import App
+from kivy.clock import Clock
+from kivy.graphics import Mesh, RenderContext
+from kivy.uix.widget import Widget
+
+from . import checkpoint
+from .spatial import SpatialHash
+from .timers import TimerQueue
+from .timeseries import TimeSeriesWriter
+
+# Size of the dot drawn for each person.
+PERSON_SIZE = 10
+
+SUSCEPTIBLE_COLOR = (1, 1, 0)
+INFECTED_COLOR = (1, 0, 0)
+RECOVERED_COLOR = (0, 0, 1)
+
+# Kivy meshes index their vertices with unsigned shorts, and each person
+# is four vertices, so people are drawn this many to a mesh.
+PEOPLE_PER_MESH = 65536 // 4 - 1
+
+# Draw every person as a round dot, coloured per vertex.
+POPULATION_VERTEX_SHADER = '''
+$HEADER$
+attribute vec3 vColor;
+void main(void) {
+    tex_coord0 = vTexCoords0;
+    frag_color = vec4(vColor, 1.0);
+    gl_Position = projection_mat * modelview_mat * vec4(vPosition.xy, 0.0, 1.0);
+}
+'''
+
+POPULATION_FRAGMENT_SHADER = '''
+$HEADER$
+void main(void) {
+    if (length(tex_coord0 - vec2(0.5)) > 0.5)
+        discard;
+    gl_FragColor = frag_color;
+}
+'''
+
+
+class Person():
+    """
+    One person: position x, y, velocity and infection state.  Arena
+    draws everyone; a Person has no widget of its own.
+    """
+
+    infected = False
+    recovered = False
+
+    def __init__(self, name=''):
+        self.name = name
+        self.x = 0
+        self.y = 0
+
+        # Give a random initial trajectory.
+        self.change_x = randchoice([-2, -1, -0.3, 0.3, 1, 2])
+        self.change_y = randchoice([-2, -1, -0.3, 0.3, 1, 2])
+        # Speed it up a bit.
+        self.change_x *= 2.0
+        self.change_y *= 2.0
+
+    @property
+    def color(self):
+        if self.infected:
+            return INFECTED_COLOR
+        if self.recovered:
+            return RECOVERED_COLOR
+        return SUSCEPTIBLE_COLOR
+
+    def infect(self):
+        '''Returns True if newly infected'''
+        # Cannot be infected a second time.
+        if self.infected or self.recovered:
+            return False
+        self.infected = True
+        return True
+
+    def recover(self):
+        self.recovered = True
+        self.infected = False
+
+class Arena(Widget):
+    """
+    Everyone bouncing round the window.  susceptible, infected and
+    recovered count people in each state, kept up to date as people are
+    infected and recover.  Given series_path, those counts are written
+    there at every tick, by a TimeSeriesWriter.  Given a Checkpointer,
+    the state is saved every so many ticks, and given a saved state the
+    run carries on from it, and so does the series.
+    """
+
+    def __init__(self, series_path=None, checkpointer=None, state=None, **kwargs):
+        self.series_path = series_path
+        self.series = None
+        self.checkpointer = checkpointer
+        super().__init__(**kwargs)
+        self.register_event_type('on_collision')
+        # The population is drawn over the background by its own shader.
+        self.population_canvas = RenderContext(use_parent_projection=True,
+                                               use_parent_modelview=True)
+        self.population_canvas.shader.vs = POPULATION_VERTEX_SHADER
+        self.population_canvas.shader.fs = POPULATION_FRAGMENT_SHADER
+        self.canvas.add(self.population_canvas)
+        self.begin(state)
+
+    def end(self, dt):
+        self.sched.cancel()
+
+    def begin(self, state=None):
+        self.tick = 0
+        self.susceptible = POPULATION_SIZE
+        self.infected = 0
+        self.recovered = 0
+        # People to recover, by the tick they recover at.
+        self.recoveries = TimerQueue()
+        self.population = [
+            Person(
+                name='{}'.format(x)
+            ) for x in range(POPULATION_SIZE)
+        ]
+
+        self.infect(self.population[0])
+        self.infect(self.population[2])
+
+        for person in self.population:
+            person.x = randint(0, self.width)
+            person.y = randint(0, self.height)
+
+        # Index people by grid cell, used to check for collisions.
+        self.grid = SpatialHash(CONTACT_DISTANCE)
+        for i, person in enumerate(self.population):
+            self.grid.insert(i, person.x, person.y)
+
+        # A square of two triangles per person, in as many meshes as
+        # their indices need.
+        self.meshes = []
+        for first in range(0, len(self.population), PEOPLE_PER_MESH):
+            indices = []
+            for i in range(min(PEOPLE_PER_MESH, len(self.population) - first)):
+                indices += [4*i, 4*i+1, 4*i+2, 4*i+2, 4*i+3, 4*i]
+            with self.population_canvas:
+                self.meshes.append(Mesh(fmt=[(b'vPosition', 2, 'float'),
+                                             (b'vTexCoords0', 2, 'float'),
+                                             (b'vColor', 3, 'float')],
+                                        indices=indices, mode='triangles'))
+        self.draw_population()
+
+        if state is not None:
+            self.restore(state)
+        if self.series_path is not None:
+            # A resumed series keeps the rows up to and including the
+            # restored tick, one a tick from 0.
+            keep = None if state is None else self.tick + 1
+            self.series = TimeSeriesWriter(self.series_path, ['tick', 'susceptible', 'infected', 'recovered'],
+                                           keep=keep)
+        if state is None:
+            self.record()
+
+        # Assume computer display refreshes at 60 frames per second - it doesn't really matter.
+        self.sched_update = Clock.schedule_interval(self.update, 1.0 / TICKS_PER_SECOND)
+
+    def infect(self, person):
+        if person.infect():
+            self.susceptible -= 1
+            self.infected += 1
+            self.recoveries.push(self.tick + RECOVER_TICKS, person)
+
+    def recover(self, person):
+        person.recover()
+        self.infected -= 1
+        self.recovered += 1
+
+    def record(self):
+        if self.series is not None:
+            self.series.append(self.tick, self.susceptible, self.infected, self.recovered)
+
+    def stop(self):
+        Clock.unschedule(self.sched_update)
+        if self.series is not None:
+            self.series.close()
+            self.series = None
+        if self.checkpointer is not None:
+            self.checkpointer.close()
+            self.checkpointer = None
+
+    def state(self):
+        """
+        Everyone's position, velocity and infection, the recoveries due
+        and the state of the random module, for checkpoint.
+        """
+        people = self.population
+        index = {id(person): i for i, person in enumerate(people)}
+        return {
+            'tick': self.tick,
+            'counts': [self.susceptible, self.infected, self.recovered],
+            'x': [person.x for person in people],
+            'y': [person.y for person in people],
+            'change_x': [person.change_x for person in people],
+            'change_y': [person.change_y for person in people],
+            'people_infected': [person.infected for person in people],
+            'people_recovered': [person.recovered for person in people],
+            'recoveries': [(tick, index[id(person)]) for tick, person in self.recoveries.items()],
+            'random': random.getstate(),
+        }
+
+    def _checkpoint_state(self):
+        # The series must hold every row up to the checkpoint, for a
+        # resumed series to carry on from it.
+        if self.series is not None:
+            self.series.sync()
+        return self.state()
+
+    def restore(self, state):
+        self.tick = state['tick']
+        self.susceptible, self.infected, self.recovered = state['counts']
+        people = self.population
+        for i, person in enumerate(people):
+            person.x = state['x'][i]
+            person.y = state['y'][i]
+            person.change_x = state['change_x'][i]
+            person.change_y = state['change_y'][i]
+            person.infected = state['people_infected'][i]
+            person.recovered = state['people_recovered'][i]
+        self.recoveries = TimerQueue()
+        for tick, i in state['recoveries']:
+            self.recoveries.push(tick, people[i])
+        version, internal, gauss = state['random']
+        random.setstate((version, tuple(internal), gauss))
+        self.grid = SpatialHash(CONTACT_DISTANCE)
+        for i, person in enumerate(people):
+            self.grid.insert(i, person.x, person.y)
+        self.draw_population()
+
+    def print_report(self):
+        print("  S/I/R", self.susceptible, self.infected, self.recovered)
+        if self.infected == 0:
+            self.stop()
+            print("No infection remaining.")
+
+    def on_collision(self, pair, *args):
+        (pair[0].change_x,pair[1].change_x) = (pair[1].change_x,pair[0].change_x)
+        (pair[0].change_y,pair[1].change_y) = (pair[1].change_y,pair[0].change_y)
+        if pair[1].infected: self.infect(pair[0])
+        if pair[0].infected: self.infect(pair[1])
+
+
+    def draw_population(self):
+        '''Everyone's position and colour, one vertex buffer update a mesh'''
+        for mesh, first in zip(self.meshes, range(0, len(self.population), PEOPLE_PER_MESH)):
+            mesh.vertices = self._vertices(self.population[first:first + PEOPLE_PER_MESH])
+
+    def _vertices(self, people):
+        vertices = []
+        for person in people:
+            x0, y0 = person.x, person.y
+            x1, y1 = x0 + PERSON_SIZE, y0 + PERSON_SIZE
+            r, g, b = person.color
+            vertices += [x0, y0, 0, 0, r, g, b,
+                         x1, y0, 1, 0, r, g, b,
+                         x1, y1, 1, 1, r, g, b,
+                         x0, y1, 0, 1, r, g, b]
+        return vertices
+
+    def update_population(self,delay):
+        for shape in self.population:
+            shape.x += shape.change_x
+            shape.y -= shape.change_y             
+
+
+    def update(self, dt):        
+        self.tick += 1
+        for person in self.recoveries.pop_due(self.tick):
+            self.recover(person)
+
+        for person in self.population:
+            if person.y < 0:
+                person.y = 0
+                person.change_y *= -1
+            if person.y > self.top:
+                person.y = self.top
+                person.change_y *= -1
+            if person.x < 0:
+                person.x = 0
+                person.change_x *= -1
+            if person.x > self.right:
+                person.x = self.right
+                person.change_x *= -1
+        self.update_population(self)
+
+        for i, person in enumerate(self.population):
+            self.grid.move(i, person.x, person.y)
+
+        # Only people in neighbouring cells can be in contact.  Pairs are
+        # handled in the order itertools.combinations would give them.
+        pairs = []
+        for i, person in enumerate(self.population):
+            for j in self.grid.near(person.x, person.y):
+                if j <= i:
+                    continue
+                other = self.population[j]
+                x = (person.x - other.x) ** 2
+                y = (person.y - other.y) ** 2
+                if x + y <= CONTACT_DISTANCE ** 2:
+                    pairs.append((i, j))
+        for i, j in sorted(pairs):
+            self.on_collision((self.population[i], self.population[j]))
+
+        self.draw_population()
+        self.record()
+        if self.checkpointer is not None:
+            self.checkpointer.maybe(self.tick, self._checkpoint_state)
+
+        if self.tick % REPORT_TICKS == 0:
+            self.print_report()
+
+class Infection(App):
+  
+    def __init__(self, series_path=None, checkpoint_path=None, every=1000, resume=False, **kwargs):
+        self.series_path = series_path
+        self.checkpoint_path = checkpoint_path
+        self.every = every
+        self.resume = resume
+        super().__init__(**kwargs)
+
+    def build(self):  
+        checkpointer = None
+        if self.checkpoint_path is not None:
+            checkpointer = checkpoint.Checkpointer(self.checkpoint_path, self.every)
+        state = checkpoint.load(self.checkpoint_path) if self.resume else None
+        scene = Arena(series_path=self.series_path, checkpointer=checkpointer, state=state)
+        self.arena = scene
+        return scene
+
+    def on_stop(self):
+        self.arena.stop()
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Infection spreading between people in a Kivy window.')
+    parser.add_argument('--series', metavar='PATH',
+                        help='write S/I/R at every tick to this file, see pandemic_maths.timeseries')
+    parser.add_argument('--checkpoint', metavar='PATH', help='save the run here every --every ticks')
+    parser.add_argument('--every', type=int, default=1000, help='ticks between checkpoints')
+    parser.add_argument('--resume', action='store_true', help='carry on from the checkpoint')
+    args = parser.parse_args(argv)
+    if args.resume and not args.checkpoint:
+        parser.error('--resume needs --checkpoint')
+    Infection(series_path=args.series, checkpoint_path=args.checkpoint,
+              every=args.every, resume=args.resume).run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Many regions, each a Population with SimpleModel spread, linked by
+travel, with the regions shared out between worker processes.
+
+Each step, every region sends some of its infectious people travelling,
+and each traveller infects one vulnerable person where they arrive.
+The travellers from every region to every other are a matrix in shared
+memory: each region writes its row, all the workers wait at a barrier,
+then each region reads its column.  The matrix is double buffered, one
+for odd steps and one for even, so writing the next step's row can't
+overwrite a row still being read, and one barrier a step is enough.
+
+Every region has its own random stream, spawned from the seed, and
+draws from it in the same order whichever worker it is on, so results
+depend only on the seed, never on the number of workers.
+"""
+
+import argparse
+import os
+from multiprocessing import Barrier, Process, shared_memory
+
+import numpy as np
+
+from .vaccination_model import Population, SimpleModel, Status
+
+
+def uniform_connections(regions):
+    """Travellers equally likely to go to any other region."""
+    connections = np.ones((regions, regions))
+    np.fill_diagonal(connections, 0)
+    return connections / max(1, regions - 1)
+
+
+def _run_shard(shard, sizes, initial, connections, travel, cell_size, steps, seeds,
+               flows_name, counts_name, barrier):
+    """Run the regions in shard, in step with the other workers."""
+    regions = len(sizes)
+    flows_memory = shared_memory.SharedMemory(name=flows_name)
+    counts_memory = shared_memory.SharedMemory(name=counts_name)
+    try:
+        flows = np.ndarray((2, regions, regions), dtype=np.int64, buffer=flows_memory.buf)
+        counts = np.ndarray((steps+1, regions, len(Status)), dtype=np.int64, buffer=counts_memory.buf)
+        rngs = {}
+        pops = {}
+        models = {}
+        for r in shard:
+            rngs[r] = np.random.default_rng(seeds[r])
+            pops[r] = Population(sizes[r])
+            models[r] = SimpleModel(pops[r], rngs[r])
+            models[r].infect(initial[r])
+            counts[0, r] = [pops[r].count_status(s) for s in Status]
+
+        for step in range(steps):
+            outgoing = flows[step % 2]
+            for r in shard:
+                travellers = rngs[r].binomial(pops[r].num_infectious(), travel)
+                if connections[r].sum() == 0:
+                    travellers = 0
+                outgoing[r] = rngs[r].multinomial(travellers, connections[r])
+            barrier.wait()
+            for r in shard:
+                arriving = min(int(outgoing[:, r].sum()), pops[r].num_vulnerable())
+                if arriving:
+                    models[r].infect(arriving)
+                models[r].spread(cell_size)
+                counts[step+1, r] = [pops[r].count_status(s) for s in Status]
+        del flows, counts, outgoing
+    finally:
+        flows_memory.close()
+        counts_memory.close()
+
+
+def run_regions(sizes, initial, connections=None, travel=0.01, cell_size=3, steps=10,
+                seed=None, workers=None):
+    """
+    Counts of people in each Status in each region, before spreading and
+    after every step, shape (steps+1, regions, len(Status)).
+
+    sizes and initial are each region's population and infections at the
+    start.  connections[i, j] is the chance a traveller from region i goes
+    to region j, uniform by default, and travel the fraction of each
+    region's infectious who travel each step.  The regions are split into
+    workers contiguous shards, one per process.
+    """
+    sizes = np.asarray(sizes)
+    initial = np.asarray(initial)
+    regions = len(sizes)
+    if connections is None:
+        connections = uniform_connections(regions)
+    seeds = np.random.SeedSequence(seed).spawn(regions)
+    workers = min(workers or os.cpu_count(), regions)
+    shards = [shard.tolist() for shard in np.array_split(np.arange(regions), workers)]
+
+    flows_memory = shared_memory.SharedMemory(create=True, size=2 * regions * regions * 8)
+    counts_memory = shared_memory.SharedMemory(create=True, size=(steps+1) * regions * len(Status) * 8)
+    try:
+        barrier = Barrier(workers)
+        args = (sizes, initial, connections, travel, cell_size, steps, seeds,
+                flows_memory.name, counts_memory.name, barrier)
+        if workers == 1:
+            _run_shard(shards[0], *args)
+        else:
+            processes = [Process(target=_run_shard, args=(shard,) + args) for shard in shards]
+            for process in processes:
+                process.start()
+            # A worker that fails would leave the rest waiting at the
+            # barrier for ever, so break it for them.
+            while any(process.is_alive() for process in processes):
+                for process in processes:
+                    process.join(0.1)
+                    if process.exitcode:
+                        barrier.abort()
+            failed = [process.exitcode for process in processes if process.exitcode]
+            if failed:
+                raise RuntimeError('metapopulation workers failed with exit codes {}'.format(failed))
+        counts = np.ndarray((steps+1, regions, len(Status)), dtype=np.int64, buffer=counts_memory.buf).copy()
+    finally:
+        flows_memory.close()
+        flows_memory.unlink()
+        counts_memory.close()
+        counts_memory.unlink()
+    return counts
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Regions linked by travel, run across processes.')
+    parser.add_argument('--regions', type=int, default=64)
+    parser.add_argument('--population', type=int, default=100_000, help='people in each region')
+    parser.add_argument('--travel', type=float, default=0.001, help='fraction of the infectious travelling each step')
+    parser.add_argument('--cell-size', type=int, default=3)
+    parser.add_argument('--steps', type=int, default=30)
+    parser.add_argument('--initial', type=int, default=10, help='people infected at the start, in the first region')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    args = parser.parse_args(argv)
+    if args.regions < 1:
+        parser.error('--regions must be at least 1')
+    if args.cell_size < 1:
+        parser.error('--cell-size must be at least 1')
+    if not 0 <= args.initial <= args.population:
+        parser.error('--initial must be between 0 and --population')
+    if not 0 <= args.travel <= 1:
+        parser.error('--travel must be between 0 and 1')
+
+    sizes = np.full(args.regions, args.population)
+    initial = np.zeros(args.regions, dtype=int)
+    initial[0] = args.initial
+    counts = run_regions(sizes, initial, travel=args.travel, cell_size=args.cell_size,
+                         steps=args.steps, seed=args.seed, workers=args.workers)
+    print("step", "regions", *(s.name.lower() for s in Status), sep='\t')
+    for step, regions in enumerate(counts):
+        infected = np.count_nonzero(regions[:, Status.INFECTIOUS.value])
+        print(step, infected, *regions.sum(axis=0), sep='\t')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+Spread over a fixed network of contacts, such as households and
+workplaces, instead of the random cells of SimpleModel.
+
+The network is held in compressed sparse row (CSR) form: the neighbours
+of person i are indices[indptr[i]:indptr[i+1]].  Each step gathers the
+neighbours of every infectious person at once, so a step costs in
+proportion to the contacts of the infectious, not to the population.
+"""
+
+import argparse
+
+import numpy as np
+
+from .vaccination_model import IndexSet, Population, Status
+
+
+# Ordered pairs of group members made at once by from_groups().
+GROUP_BATCH_PAIRS = 1 << 22
+
+
+class ContactNetwork:
+    """
+    Undirected contacts between size people, each pair stored both ways
+    round in CSR form.
+    """
+
+    def __init__(self, indptr, indices):
+        self.indptr = indptr
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def num_edges(self) -> int:
+        """Contacts, each counted once."""
+        return len(self.indices) // 2
+
+    def degree(self):
+        return np.diff(self.indptr)
+
+    def neighbours(self, index):
+        return self.indices[self.indptr[index]:self.indptr[index+1]]
+
+    def gather(self, index):
+        """The neighbours of every person in index, end to end."""
+        starts = self.indptr[index]
+        counts = self.indptr[np.asarray(index) + 1] - starts
+        # Each person's run of neighbours, laid end to end.
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.indices[np.repeat(starts, counts) + offset]
+
+    @classmethod
+    def from_edges(cls, size, first, second):
+        """
+        The network of contacts first[k]-second[k].  Self contacts and
+        repeats of a contact are dropped.
+        """
+        first = np.asarray(first, dtype=np.int64)
+        second = np.asarray(second, dtype=np.int64)
+        keep = first != second
+        return cls._from_keys(size, [first[keep] * size + second[keep], second[keep] * size + first[keep]])
+
+    @classmethod
+    def _from_keys(cls, size, keys):
+        """
+        The network from arrays of keys source * size + target, one per
+        contact each way round.  Sorting the keys puts each person's
+        neighbours together and repeats next to each other; the work is
+        done in place where it can be, as there may be billions.
+        """
+        key = np.concatenate(keys)
+        del keys[:]
+        key.sort()
+        if len(key):
+            repeat = np.empty(len(key), dtype=bool)
+            repeat[0] = False
+            np.equal(key[1:], key[:-1], out=repeat[1:])
+            if repeat.any():
+                key = key[~repeat]
+            del repeat
+        indptr = np.searchsorted(key, np.arange(size + 1, dtype=np.int64) * size)
+        np.remainder(key, size, out=key)
+        indices = key.astype(np.int32 if size < 2**31 else np.int64)
+        return cls(indptr, indices)
+
+    @classmethod
+    def from_groups(cls, size, *layers):
+        """
+        Everyone in contact with everyone else in each of their groups.
+        Each layer gives every person's group, such as their household
+        or workplace, or -1 for none.
+        """
+        keys = []
+        for groups in layers:
+            groups = np.asarray(groups)
+            members = np.flatnonzero(groups >= 0)
+            members = members[np.argsort(groups[members], kind='stable')]
+            labels = groups[members]
+            # Where each group starts in members, and its size.
+            starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+            sizes = np.diff(np.r_[starts, len(members)])
+            # A group of k has k * k ordered pairs; groups are taken a
+            # batch at a time to bound the memory they need.
+            pairs = np.cumsum(sizes * sizes)
+            first_group = 0
+            while first_group < len(starts):
+                end_group = max(first_group + 1, int(np.searchsorted(
+                    pairs, pairs[first_group] - sizes[first_group]**2 + GROUP_BATCH_PAIRS, side='right')))
+                batch = slice(first_group, end_group)
+                keys.append(cls._clique_keys(size, members, starts[batch], sizes[batch]))
+                first_group = end_group
+        return cls._from_keys(size, keys)
+
+    @staticmethod
+    def _clique_keys(size, members, starts, sizes):
+        """Keys for every ordered pair of distinct members of each group."""
+        member = np.repeat(np.arange(starts[0], starts[-1] + sizes[-1]), np.repeat(sizes, sizes))
+        count = np.repeat(sizes, sizes)
+        offset = np.arange(len(member)) - np.repeat(np.cumsum(count) - count, count)
+        other = np.repeat(np.repeat(starts, sizes), count) + offset
+        key = members[member] * size + members[other]
+        return key[member != other]
+
+
+def random_groups(size, mean, rng):
+    """A group for each of size people, in groups of about mean people."""
+    return rng.integers(0, max(1, round(size / mean)), size)
+
+
+class NetworkModel():
+    """
+    Each step every infectious person infects each vulnerable neighbour
+    with probability transmission, and recovers after infectious_steps
+    steps.  The infectious are kept in an IndexSet, updated by listening
+    to the Population, so a step never scans the population.
+    """
+
+    def __init__(self, pop:Population, network:ContactNetwork, transmission=0.1,
+                 infectious_steps=5, rng=None) -> None:
+        self._pop = pop
+        self.network = network
+        self.transmission = transmission
+        self.infectious_steps = infectious_steps
+        self._rng = np.random.default_rng(rng)
+        pos = np.full(len(pop), -1, dtype=np.int32 if len(pop) < 2**31 else np.int64)
+        self._infectious = IndexSet(len(pop), pos)
+        self._infectious.add(np.flatnonzero(pop.data() == Status.INFECTIOUS.value))
+        pop.add_listener(self._moved)
+
+    def _moved(self, index, old, status:Status) -> None:
+        infectious = Status.INFECTIOUS.value
+        if status == Status.INFECTIOUS:
+            self._infectious.add(index[old != infectious])
+        else:
+            self._infectious.remove(index[old == infectious])
+
+    def infectious(self):
+        return self._infectious.members()
+
+    def infect(self, number=1) -> None:
+        vulnerable = np.flatnonzero(self._pop.data() == Status.VULNERABLE.value)
+        if not 0 <= number <= len(vulnerable):
+            raise ValueError('cannot infect {} of {} vulnerable people'.format(number, len(vulnerable)))
+        self._pop.infect(self._rng.choice(vulnerable, size=number, replace=False))
+
+    def step(self) -> None:
+        infectious = self._infectious.members().copy()
+        contacts = self.network.gather(infectious)
+        contacts = contacts[self._pop.data()[contacts] == Status.VULNERABLE.value]
+        caught = np.unique(contacts[self._rng.random(len(contacts)) < self.transmission])
+
+        self._pop.infection_incr(infectious)
+        done = self._pop.infection_duration()[infectious] >= self.infectious_steps
+        self._pop.recover(infectious[done])
+        self._pop.infect(caught)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Spread through households and workplaces.')
+    parser.add_argument('--population', type=int, default=1_000_000)
+    parser.add_argument('--household', type=float, default=3, help='mean household size')
+    parser.add_argument('--workplace', type=float, default=10, help='mean workplace size')
+    parser.add_argument('--transmission', type=float, default=0.1, help='chance of infecting a contact each step')
+    parser.add_argument('--infectious', type=int, default=5, help='steps infectious')
+    parser.add_argument('--steps', type=int, default=30)
+    parser.add_argument('--initial', type=int, default=10, help='people infected at the start')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+    if not 0 <= args.initial <= args.population:
+        parser.error('--initial must be between 0 and --population')
+    if not 0 <= args.transmission <= 1:
+        parser.error('--transmission must be between 0 and 1')
+
+    rng = np.random.default_rng(args.seed)
+    network = ContactNetwork.from_groups(args.population,
+                                         random_groups(args.population, args.household, rng),
+                                         random_groups(args.population, args.workplace, rng))
+    print("{} people, {} contacts".format(len(network), network.num_edges()))
+    pop = Population(args.population)
+    model = NetworkModel(pop, network, args.transmission, args.infectious, rng)
+    model.infect(args.initial)
+    print("step", *(s.name.lower() for s in Status), sep='\t')
+    print(0, *(pop.count_status(s) for s in Status), sep='\t')
+    for i in range(args.steps):
+        model.step()
+        print(i+1, *(pop.count_status(s) for s in Status), sep='\t')
+
+
+if __name__ == '__main__':
+    main()
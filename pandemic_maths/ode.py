@@ -0,0 +1,142 @@
+"""
+Deterministic S/I/R/V model: the fraction of the population in each
+Status, following the ordinary differential equations
+
+    dS/dt = -beta S I - nu S
+    dI/dt =  beta S I - gamma I
+    dR/dt =  gamma I - nu R
+    dV/dt =  nu (S + R)
+
+with time in steps of the agent models, and beta, gamma and nu as in
+stochastic.  Every parameter may be an array: integrate() solves every
+combination at once as one batched system, so a sweep over thousands of
+policies is a few array operations per time step.
+
+Early on, while S stays near its starting value, I grows exponentially,
+so doubling_time() and final_size() answer the usual questions without
+integrating at all.
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from .vaccination_model import Status
+
+
+def initial_state(infected=1e-4, vaccinated=0.0):
+    """Fractions in Status value order, the rest vulnerable."""
+    y = np.zeros(len(Status))
+    y[Status.VULNERABLE.value] = 1.0 - infected - vaccinated
+    y[Status.INFECTIOUS.value] = infected
+    y[Status.VACCINATED.value] = vaccinated
+    return y
+
+
+def _derivatives(s, i, r, v, beta, gamma, nu):
+    infect = beta * s * i
+    recover = gamma * i
+    return (-infect - nu * s,
+            infect - recover,
+            recover - nu * r,
+            nu * (s + r))
+
+
+def integrate(y0, steps, beta, gamma, nu=0.0, substeps=4):
+    """
+    Classic fourth order Runge-Kutta, substeps per step.  y0 has Status
+    values on its last axis, and broadcasts with beta, gamma and nu over
+    the others.  Returns the state after every step, shape
+    (steps+1,) + the broadcast shape + (len(Status),).
+    """
+    y0 = np.asarray(y0, dtype=float)
+    shape = np.broadcast_shapes(y0.shape[:-1], np.shape(beta), np.shape(gamma), np.shape(nu))
+    state = [np.broadcast_to(y0[..., k], shape).copy() for k in range(len(Status))]
+    h = 1 / substeps
+    out = np.empty((steps+1,) + shape + (len(Status),))
+    out[0] = np.stack(state, axis=-1)
+    for step in range(steps):
+        for sub in range(substeps):
+            k1 = _derivatives(*state, beta, gamma, nu)
+            k2 = _derivatives(*(y + h/2 * k for y, k in zip(state, k1)), beta, gamma, nu)
+            k3 = _derivatives(*(y + h/2 * k for y, k in zip(state, k2)), beta, gamma, nu)
+            k4 = _derivatives(*(y + h * k for y, k in zip(state, k3)), beta, gamma, nu)
+            state = [y + h/6 * (a + 2*b + 2*c + d) for y, a, b, c, d in zip(state, k1, k2, k3, k4)]
+        out[step+1] = np.stack(state, axis=-1)
+    return out
+
+
+def growth_rate(beta, gamma, vulnerable=1.0):
+    """The early exponential growth rate of I, per step."""
+    return np.asarray(beta) * vulnerable - gamma
+
+
+def doubling_time(beta, gamma, vulnerable=1.0):
+    """
+    Steps for I to double early on, log(2) / growth rate; infinite when
+    the epidemic is not growing.
+    """
+    rate = growth_rate(beta, gamma, vulnerable)
+    with np.errstate(divide='ignore'):
+        return np.where(rate > 0, math.log(2) / rate, np.inf)
+
+
+def final_size(r0, vulnerable=1.0, infectious=0.0, tolerance=1e-12, iterations=100):
+    """
+    The fraction of the population infected by the end of an epidemic
+    without vaccination, counting those infectious at the start.  The
+    fraction s never infected satisfies
+
+        s = vulnerable * exp(-r0 * (vulnerable + infectious - s))
+
+    which is solved by Newton's method from s = 0.  The right hand side
+    minus s is convex, so the iterates climb to its smallest root
+    without overshooting it.  r0 and the starting fractions may be
+    arrays.
+    """
+    r0, vulnerable, infectious = np.broadcast_arrays(
+        np.asarray(r0, dtype=float), np.asarray(vulnerable, dtype=float), np.asarray(infectious, dtype=float))
+    s = np.zeros(r0.shape)
+    for i in range(iterations):
+        e = vulnerable * np.exp(-r0 * (vulnerable + infectious - s))
+        change = (s - e) / (1 - r0 * e)
+        s = s - change
+        if np.all(np.abs(change) < tolerance):
+            break
+    return vulnerable + infectious - s
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Sweep the S/I/R/V equations over R0 and vaccination rates.')
+    parser.add_argument('--r0', type=float, nargs=2, default=(1.0, 4.0), metavar=('LOW', 'HIGH'))
+    parser.add_argument('--r0-count', type=int, default=7)
+    parser.add_argument('--gamma', type=float, default=math.log(2), help='recovery rate per step')
+    parser.add_argument('--vaccination', type=float, nargs='+', default=[0.0, 0.01, 0.05],
+                        help='fractions vaccinated per step')
+    parser.add_argument('--infected', type=float, default=1e-4, help='fraction infectious at the start')
+    parser.add_argument('--steps', type=int, default=100)
+    args = parser.parse_args(argv)
+
+    r0 = np.linspace(*args.r0, args.r0_count)
+    beta = (r0 * args.gamma)[:, None]
+    nu = -np.log1p(-np.array(args.vaccination))[None, :]
+    start = time.perf_counter()
+    trajectory = integrate(initial_state(args.infected), args.steps, beta, args.gamma, nu)
+    elapsed = time.perf_counter() - start
+    peak = trajectory[..., Status.INFECTIOUS.value].max(axis=0)
+    vulnerable = trajectory[-1, ..., Status.VULNERABLE.value]
+    doubling = doubling_time(beta[:, 0], args.gamma, 1 - args.infected)
+    final = final_size(r0, 1 - args.infected, args.infected)
+
+    print("{} runs of {} steps in {:.3f}s".format(beta.size * nu.size, args.steps, elapsed))
+    print("Peak infectious / still vulnerable at step {}, for each vaccination rate".format(args.steps))
+    print("r0", "doubling", "final", *('vacc {:g}'.format(v) for v in args.vaccination), sep='\t')
+    for k in range(len(r0)):
+        cols = ['{:.3f}/{:.3f}'.format(p, f) for p, f in zip(peak[k], vulnerable[k])]
+        print('{:g}'.format(r0[k]), '{:.3g}'.format(doubling[k]), '{:.3f}'.format(final[k]), *cols, sep='\t')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Uniform grid spatial hash, so contact tests only look at nearby objects
+rather than comparing every pair.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+
+class SpatialHash:
+    """
+    Objects, by id, in square cells of side cell_size.  Two objects
+    closer than cell_size on both axes are always in the same or
+    adjacent cells, so near() finds every possible contact.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self._cells = defaultdict(set)
+        self._where = {}
+
+    def cell(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, id, x, y):
+        cell = self.cell(x, y)
+        self._cells[cell].add(id)
+        self._where[id] = cell
+
+    def remove(self, id):
+        cell = self._where.pop(id)
+        self._cells[cell].discard(id)
+
+    def move(self, id, x, y):
+        cell = self.cell(x, y)
+        old = self._where[id]
+        if cell != old:
+            self._cells[old].discard(id)
+            self._cells[cell].add(id)
+            self._where[id] = cell
+
+    def near(self, x, y):
+        """Ids in the cell containing (x, y) and the eight around it."""
+        cx, cy = self.cell(x, y)
+        for i in (cx-1, cx, cx+1):
+            for j in (cy-1, cy, cy+1):
+                cell = self._cells.get((i, j))
+                if cell:
+                    yield from cell
+
+
+def grid_pairs(x, y, cell_size):
+    """
+    Every ordered pair (i, j), i != j, of points closer than cell_size
+    on both axes, as two index arrays sorted by i then j.  Only points in
+    the same or adjacent cells of a cell_size grid are compared.
+    """
+    if len(x) == 0:
+        return np.arange(0), np.arange(0)
+    cx = np.floor(x / cell_size).astype(np.int64)
+    cy = np.floor(y / cell_size).astype(np.int64)
+    cx -= cx.min() - 1
+    cy -= cy.min() - 1
+    # One integer key per cell, with room for the neighbours of the edge
+    # cells so keys never wrap onto the next column.
+    rows = cy.max() + 2
+    key = cx * rows + cy
+    order = np.argsort(key, kind='stable')
+    sorted_key = key[order]
+
+    # The occupied cells, where their points start in the sorted order,
+    # how many there are, and the cell each sorted point is in.
+    new_cell = np.empty(len(x), dtype=bool)
+    new_cell[:1] = True
+    np.not_equal(sorted_key[1:], sorted_key[:-1], out=new_cell[1:])
+    starts = np.flatnonzero(new_cell)
+    cells = sorted_key[starts]
+    sizes = np.diff(np.append(starts, len(x)))
+    point_cell = np.cumsum(new_cell) - 1
+
+    # Pairs within a cell, then pairs with the four cells ahead of it,
+    # which are added both ways round.
+    points = np.arange(len(x))
+    firsts = []
+    seconds = []
+    for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        if dx == dy == 0:
+            found = np.arange(len(cells))
+            occupied = True
+        else:
+            near = cells + dx * rows + dy
+            found = np.minimum(np.searchsorted(cells, near), len(cells) - 1)
+            occupied = cells[found] == near
+        start = starts[found][point_cell]
+        count = np.where(occupied, sizes[found], 0)[point_cell]
+        # Expand each point's run of neighbours in the sorted order.
+        offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        first = np.repeat(points, count)
+        second = np.repeat(start, count) + offset
+        firsts.append(first)
+        seconds.append(second)
+        if dx or dy:
+            firsts.append(second)
+            seconds.append(first)
+    first = order[np.concatenate(firsts)]
+    second = order[np.concatenate(seconds)]
+    close = ((first != second)
+             & (np.abs(x[first] - x[second]) < cell_size)
+             & (np.abs(y[first] - y[second]) < cell_size))
+    first = first[close]
+    second = second[close]
+    order = np.lexsort((second, first))
+    return first[order], second[order]
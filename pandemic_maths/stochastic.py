@@ -0,0 +1,211 @@
+"""
+Stochastic compartmental model: counts of people in each Status rather
+than one entry per person, so it runs at any population size.
+
+People move between states at random with rates
+
+    VULNERABLE -> INFECTIOUS    beta * vulnerable * infectious / population
+    INFECTIOUS -> RECOVERED     gamma * infectious
+    VULNERABLE -> VACCINATED    nu * vulnerable
+    RECOVERED  -> VACCINATED    nu * recovered
+
+per step of the agent models.  gillespie() simulates every event
+exactly; tau_leap() draws how many of each happen in a short time tau,
+so its cost doesn't grow with the population and it runs many
+replicates at once.  Both return the counts after every whole step, in
+the same layout as ensemble.run_replicate().
+
+rates_from_simple_model() and rates_from_ball_world() calibrate beta
+and gamma from the contact parameters of the agent models.
+"""
+
+import argparse
+import itertools
+import math
+
+import numpy as np
+
+from .vaccination_model import Status
+from .virus_spread import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, VELOCITIES, DEFAULT_SPEED, INFECTIOUS_STEPS,
+)
+
+VULNERABLE = Status.VULNERABLE.value
+INFECTIOUS = Status.INFECTIOUS.value
+RECOVERED = Status.RECOVERED.value
+VACCINATED = Status.VACCINATED.value
+
+
+def initial_counts(population, infected=1):
+    """Counts, in Status value order, with infected people infectious."""
+    counts = np.zeros(len(Status), dtype=np.int64)
+    counts[VULNERABLE] = population - infected
+    counts[INFECTIOUS] = infected
+    return counts
+
+
+def rates_from_simple_model(cell_size=3):
+    """
+    beta and gamma for SimpleModel.spread(cell_size).  Each step an
+    infectious person shares a cell with cell_size - 1 others, infecting
+    those who are vulnerable, and recovers.  So early on infections
+    multiply by R0 = cell_size - 1 a step, and each infects R0 people in
+    all.  Matching both, beta - gamma = log(R0) and beta / gamma = R0,
+    gives the same growth and the same final size.  A cell of one has
+    nobody to infect, so cell_size must be at least 2.
+    """
+    if cell_size < 2:
+        raise ValueError('cell_size must be at least 2, not {}'.format(cell_size))
+    r0 = cell_size - 1
+    gamma = math.log(r0) / (r0 - 1) if r0 != 1 else 1.0
+    return r0 * gamma, gamma
+
+
+def rates_from_ball_world(balls=100, width=WINDOW_WIDTH, height=WINDOW_HEIGHT,
+                          ball_size=10, speed=DEFAULT_SPEED):
+    """
+    beta and gamma for a BallWorld, from the kinetic theory of a 2D gas.
+    A ball sweeps out a strip as wide as the distance at which balls
+    meet, 2 * ball_size across, at the mean speed of balls relative to
+    each other, and meets balls at their density in the box their centres
+    can reach.  A ball stays infectious INFECTIOUS_STEPS steps.
+    """
+    velocities = VELOCITIES[speed]
+    # Each axis of each ball's velocity is an equally likely choice.
+    relative = [math.hypot(x1 - x2, y1 - y2)
+                for x1, y1, x2, y2 in itertools.product(velocities, repeat=4)]
+    mean_speed = sum(relative) / len(relative)
+    area = (width - 2 * ball_size) * (height - 2 * ball_size)
+    beta = 2 * ball_size * mean_speed * balls / area
+    return beta, 1 / INFECTIOUS_STEPS
+
+
+def _uniforms(rng, block=4096):
+    """Endless uniform draws, made a block at a time."""
+    while True:
+        yield from rng.random(block).tolist()
+
+
+def gillespie(counts, steps, beta, gamma, nu=0.0, rng=None):
+    """
+    Exact simulation, one event at a time: the time to the next event
+    is exponential at the total rate, and which event it is is chosen in
+    proportion to the rates.  Cost grows with the number of events, so
+    this is for populations up to around a million; use tau_leap() past
+    that.  Returns the counts after each step, shape
+    (steps+1, len(Status)).
+    """
+    rng = np.random.default_rng(rng)
+    uniforms = _uniforms(rng)
+    s, i, r, v = (int(c) for c in counts)
+    n = s + i + r + v
+    out = np.empty((steps+1, len(Status)), dtype=np.int64)
+    out[0] = s, i, r, v
+    t = 0.0
+    step = 1
+    while step <= steps:
+        infect = beta * s * i / n
+        recover = gamma * i
+        vaccinate = nu * s
+        revaccinate = nu * r
+        total = infect + recover + vaccinate + revaccinate
+        if total == 0:
+            break
+        t -= math.log(1.0 - next(uniforms)) / total
+        while step <= steps and t > step:
+            out[step] = s, i, r, v
+            step += 1
+        u = next(uniforms) * total
+        if u < infect:
+            s -= 1
+            i += 1
+        elif u < infect + recover:
+            i -= 1
+            r += 1
+        elif u < infect + recover + vaccinate:
+            s -= 1
+            v += 1
+        else:
+            r -= 1
+            v += 1
+    out[step:] = s, i, r, v
+    return out
+
+
+def tau_leap(counts, steps, beta, gamma, nu=0.0, substeps=10, rng=None):
+    """
+    Approximate simulation in leaps of tau = 1/substeps steps, with rates
+    held fixed over each leap.  The number leaving each state is binomial
+    in the number there, so counts never go negative, and people leaving
+    VULNERABLE are split between infection and vaccination in proportion
+    to their rates.
+
+    counts may have leading dimensions, one per replicate or parameter
+    set, with beta, gamma and nu scalars or arrays broadcasting against
+    them; every replicate leaps together.  Returns the counts after each
+    step, shape (steps+1,) + counts.shape.
+    """
+    rng = np.random.default_rng(rng)
+    counts = np.array(counts, dtype=np.int64)
+    shape = counts.shape[:-1]
+    beta = np.broadcast_to(beta, shape)
+    gamma = np.broadcast_to(gamma, shape)
+    nu = np.broadcast_to(nu, shape)
+    tau = 1 / substeps
+    s, i, r, v = (counts[..., k].copy() for k in range(len(Status)))
+    n = s + i + r + v
+    recover = -np.expm1(-gamma * tau)
+    revaccinate = -np.expm1(-nu * tau)
+    out = np.empty((steps+1,) + counts.shape, dtype=np.int64)
+    out[0] = counts
+    for step in range(steps):
+        for leap in range(substeps):
+            force = beta * i / n
+            hazard = force + nu
+            leave = rng.binomial(s, -np.expm1(-hazard * tau))
+            infected = rng.binomial(leave, np.divide(force, hazard, out=np.zeros(shape), where=hazard > 0))
+            recovered = rng.binomial(i, recover)
+            vaccinated = rng.binomial(r, revaccinate)
+            s = s - leave
+            i = i + infected - recovered
+            r = r + recovered - vaccinated
+            v = v + leave - infected + vaccinated
+        out[step+1] = np.stack([s, i, r, v], axis=-1)
+    return out
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Stochastic S/I/R/V counts, calibrated from an agent model.')
+    parser.add_argument('--population', type=int, default=60_000_000)
+    parser.add_argument('--initial', type=int, default=10, help='people infected at the start')
+    parser.add_argument('--steps', type=int, default=30)
+    parser.add_argument('--method', choices=['tau', 'exact'], default='tau')
+    parser.add_argument('--substeps', type=int, default=10, help='tau leaps per step')
+    parser.add_argument('--calibrate', choices=['cells', 'balls'], default='cells',
+                        help='take rates from the vaccination model cells or the bouncing balls')
+    parser.add_argument('--cell-size', type=int, default=3)
+    parser.add_argument('--balls', type=int, default=100, help='balls whose density sets the contact rate')
+    parser.add_argument('--vaccination', type=float, default=0.0, help='fraction vaccinated per step')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+    if args.cell_size < 2:
+        parser.error('--cell-size must be at least 2')
+
+    if args.calibrate == 'cells':
+        beta, gamma = rates_from_simple_model(args.cell_size)
+    else:
+        beta, gamma = rates_from_ball_world(args.balls)
+    nu = -math.log1p(-args.vaccination)
+    counts = initial_counts(args.population, args.initial)
+    if args.method == 'exact':
+        trajectory = gillespie(counts, args.steps, beta, gamma, nu, args.seed)
+    else:
+        trajectory = tau_leap(counts, args.steps, beta, gamma, nu, args.substeps, args.seed)
+    print("beta {:g} gamma {:g} nu {:g}".format(beta, gamma, nu))
+    print("step", *(s.name.lower() for s in Status), sep='\t')
+    for step, row in enumerate(trajectory):
+        print(step, *row, sep='\t')
+
+
+if __name__ == '__main__':
+    main()
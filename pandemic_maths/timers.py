@@ -0,0 +1,41 @@
+"""
+Timers counted in simulation ticks rather than wall-clock time.
+"""
+
+import heapq
+
+
+class TimerQueue:
+    """
+    Items due at given ticks.  Items for the same tick share a bucket,
+    and a min-heap holds the ticks that have buckets, so pushing is
+    O(log ticks) and pop_due hands back everything due as one batch.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._ticks = []
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def push(self, tick, item):
+        bucket = self._buckets.get(tick)
+        if bucket is None:
+            bucket = self._buckets[tick] = []
+            heapq.heappush(self._ticks, tick)
+        bucket.append(item)
+        self._len += 1
+
+    def items(self):
+        """(tick, item) for everything queued, in the order pop_due gives them."""
+        return [(tick, item) for tick in sorted(self._ticks) for item in self._buckets[tick]]
+
+    def pop_due(self, tick):
+        """Everything due at or before tick, earliest first, in push order."""
+        due = []
+        while self._ticks and self._ticks[0] <= tick:
+            due.extend(self._buckets.pop(heapq.heappop(self._ticks)))
+        self._len -= len(due)
+        return due
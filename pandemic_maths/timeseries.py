@@ -0,0 +1,179 @@
+"""
+Compact columnar time series files, written by a background thread so
+that recording a row never waits on the disk.
+
+Layout, all little-endian:
+
+    b'PMTS'                     magic
+    uint8   typecode            array module typecode of every value
+    uint8   itemsize            bytes per value
+    uint16  columns
+    per column: uint16 length, then the name in UTF-8
+    blocks, to the end of the file:
+        uint32  rows
+        per column: rows values
+"""
+
+import os
+import queue
+import struct
+import sys
+import threading
+from array import array
+
+MAGIC = b'PMTS'
+
+
+class TimeSeriesWriter:
+    """
+    Rows are gathered into in-memory column arrays; every block_rows rows
+    the block is handed to a writer thread, so append() is O(1).  Call
+    close(), or use as a context manager, to write the last rows.
+
+    Given keep, the file at path is carried on after its first keep rows
+    rather than started afresh, and any rows after those are dropped; it
+    must have the same columns and typecode.
+    """
+
+    def __init__(self, path, columns, block_rows=4096, typecode='I', keep=None):
+        self.columns = list(columns)
+        self.block_rows = block_rows
+        self.typecode = typecode
+        self._block = self._new_block()
+        if keep is None:
+            self._file = open(path, 'wb')
+            self._file.write(MAGIC)
+            self._file.write(struct.pack('<BBH', ord(typecode), array(typecode).itemsize, len(self.columns)))
+            for name in self.columns:
+                name = name.encode('utf-8')
+                self._file.write(struct.pack('<H', len(name)) + name)
+        else:
+            self._file = open(path, 'r+b')
+            self._keep(path, keep)
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def _keep(self, path, keep):
+        """Truncate the file after keep rows, any in a part block to self._block."""
+        f = self._file
+        typecode, names = _read_header(f, path)
+        if typecode != self.typecode or names != self.columns:
+            raise ValueError('{} has columns {} of type {!r}, not {} of type {!r}'.format(
+                path, names, typecode, self.columns, self.typecode))
+        itemsize = array(typecode).itemsize
+        wanted = keep
+        while keep > 0:
+            start = f.tell()
+            header = f.read(4)
+            if not header:
+                raise ValueError('{} has {} rows, not the {} to keep'.format(path, wanted - keep, wanted))
+            rows, = struct.unpack('<I', header)
+            if rows > keep:
+                # Keep the front of this block, rewritten as a new one.
+                for column in self._block:
+                    column.fromfile(f, rows)
+                    if sys.byteorder == 'big':
+                        column.byteswap()
+                    del column[keep:]
+                f.seek(start)
+                break
+            f.seek(rows * itemsize * len(names), 1)
+            keep -= rows
+        f.truncate()
+
+    def _new_block(self):
+        return [array(self.typecode) for name in self.columns]
+
+    def append(self, *values):
+        for column, value in zip(self._block, values):
+            column.append(value)
+        if len(self._block[0]) == self.block_rows:
+            self.flush()
+
+    def flush(self):
+        """Hand the rows so far to the writer thread."""
+        if self._error is not None:
+            raise self._error
+        if len(self._block[0]):
+            self._queue.put(self._block)
+            self._block = self._new_block()
+
+    def sync(self):
+        """Write the rows so far to disk, waiting until they are there."""
+        self.flush()
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _write(self):
+        while True:
+            block = self._queue.get()
+            if block is None:
+                self._queue.task_done()
+                break
+            # After a failure the rest are dropped; flush() and close()
+            # raise it.
+            if self._error is None:
+                try:
+                    self._file.write(struct.pack('<I', len(block[0])))
+                    for column in block:
+                        if sys.byteorder == 'big':
+                            column.byteswap()
+                        column.tofile(self._file)
+                except Exception as e:
+                    self._error = e
+            self._queue.task_done()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+            self._file.close()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read_header(f, path):
+    """The typecode and column names of an open file, left at its first block."""
+    if f.read(4) != MAGIC:
+        raise ValueError('{} is not a time series file'.format(path))
+    typecode, itemsize, count = struct.unpack('<BBH', f.read(4))
+    typecode = chr(typecode)
+    if array(typecode).itemsize != itemsize:
+        raise ValueError('{} has {}-byte values, this platform has {}'.format(
+            path, itemsize, array(typecode).itemsize))
+    names = []
+    for i in range(count):
+        length, = struct.unpack('<H', f.read(2))
+        names.append(f.read(length).decode('utf-8'))
+    return typecode, names
+
+
+def read_timeseries(path):
+    """The whole file as {column name: array of values}."""
+    with open(path, 'rb') as f:
+        typecode, names = _read_header(f, path)
+        columns = {name: array(typecode) for name in names}
+        while True:
+            header = f.read(4)
+            if not header:
+                break
+            rows, = struct.unpack('<I', header)
+            for name in names:
+                columns[name].fromfile(f, rows)
+    if sys.byteorder == 'big':
+        for column in columns.values():
+            column.byteswap()
+    return columns
@@ -0,0 +1,465 @@
+
+import argparse
+from enum import Enum
+
+import numpy as np
+
+from . import checkpoint
+
+class Status(Enum):
+    VULNERABLE = 0  # Can be infected. Can be vaccinated.
+    INFECTIOUS = 1  # Can infect others. Cannot be infected. Cannot be vaccinated. Will recover after infectious period.
+    RECOVERED = 2 # Cannot be infected. Can be vaccinated.
+    VACCINATED = 3 # Cannot be infected.
+
+class Person():
+    def __init__(self) -> None:
+        self._status = Status.VULNERABLE
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, value:Status) -> None:
+        self._status = value
+    
+    def can_infect(self):
+        return self._status == Status.INFECTIOUS
+    
+    def can_be_infected(self):
+        return self._status == Status.VULNERABLE
+
+    def infect(self) -> None:
+        self.status = Status.INFECTIOUS
+        self.infection_duration = 0
+
+    def infection_incr(self) -> None:
+        self.infection_duration += 1
+
+    def recover(self) -> None:
+        self.status = Status.RECOVERED
+
+    def can_be_vaccinated(self):
+        return self._status in {Status.VULNERABLE, Status.RECOVERED} 
+
+    def vaccinate(self) -> None:
+        self.status = Status.VACCINATED
+
+# A Population file, all little-endian:
+#
+#     0   8 bytes   magic, b"PANDPOP\0"
+#     8   uint32    version, POPULATION_VERSION
+#    12   uint32    header size, POPULATION_HEADER_SIZE
+#    16   int64     N, the number of people
+#    24   int64[4]  count of people in each Status, in Status value order
+#    56   8 bytes   reserved, zero
+#    64   int8[N]   status of each person, a Status value
+#         padding to a multiple of 8 bytes
+#         uint16[N] infection duration of each person
+POPULATION_MAGIC = b'PANDPOP\0'
+POPULATION_VERSION = 1
+POPULATION_HEADER_SIZE = 64
+
+
+def _population_layout(size):
+    """Offsets of the status and duration arrays, and the file size."""
+    status = POPULATION_HEADER_SIZE
+    duration = status + (size + 7) // 8 * 8
+    return status, duration, duration + 2 * size
+
+
+class Population():
+    """
+    Status and infection duration for every person, held in compact
+    typed arrays (one byte for status, two for duration) rather than a
+    Person object each.  Transitions take a person index, a boolean mask
+    or an array of distinct indices.
+
+    A count of people in each Status is kept up to date by every
+    transition, so the num_* queries don't scan the population.
+
+    Given a path, the arrays and counts live in a memory-mapped file
+    laid out as above rather than on the heap.  That moves only the
+    population's own three bytes a person out of memory: SimpleModel
+    still shuffles everyone each step, and a Campaign indexes everyone,
+    so a run needs several times that in memory either way.  What the
+    file is for is sharing: Population.open() attaches to it, read-only
+    by default, and a viewer in another process sees the counts change
+    as the run goes on, without copying or pausing it.  The counts of a
+    transition are updated one after the other, so a viewer may catch
+    them out by that transition.
+    """
+    def __init__(self,size = 100, path=None) -> None:
+        if path is None:
+            self._status = np.full(size, Status.VULNERABLE.value, dtype=np.int8)
+            self._infection_duration = np.zeros(size, dtype=np.uint16)
+            self._counts = np.zeros(len(Status), dtype=np.int64)
+            self._mmap = None
+        else:
+            end = _population_layout(size)[2]
+            self._map(np.memmap(path, dtype=np.uint8, mode='w+', shape=end), size)
+            header = self._mmap[:24]
+            header[:8] = np.frombuffer(POPULATION_MAGIC, dtype=np.uint8)
+            header[8:16].view('<u4')[:] = POPULATION_VERSION, POPULATION_HEADER_SIZE
+            header[16:24].view('<i8')[0] = size
+            self._status[:] = Status.VULNERABLE.value
+        self._counts[:] = 0
+        self._counts[Status.VULNERABLE.value] = size
+        self._listeners = []
+
+    def _map(self, mmap, size) -> None:
+        status, duration, end = _population_layout(size)
+        self._mmap = mmap
+        self._counts = mmap[24:24 + 8 * len(Status)].view('<i8')
+        self._status = mmap[status:status + size].view(np.int8)
+        self._infection_duration = mmap[duration:end].view('<u2')
+
+    @classmethod
+    def open(cls, path, writable=False) -> 'Population':
+        """
+        The Population in a file written by Population(size, path),
+        read-only unless writable.
+        """
+        mmap = np.memmap(path, dtype=np.uint8, mode='r+' if writable else 'r')
+        if bytes(mmap[:8]) != POPULATION_MAGIC:
+            raise ValueError('{} is not a population file'.format(path))
+        version, header_size = mmap[8:16].view('<u4')
+        if version != POPULATION_VERSION or header_size != POPULATION_HEADER_SIZE:
+            raise ValueError('{} is population file version {}, not {}'.format(path, version, POPULATION_VERSION))
+        size = int(mmap[16:24].view('<i8')[0])
+        if len(mmap) != _population_layout(size)[2]:
+            raise ValueError('{} is the wrong length for {} people'.format(path, size))
+        pop = cls.__new__(cls)
+        pop._map(mmap, size)
+        pop._listeners = []
+        return pop
+
+    def flush(self) -> None:
+        """Write a memory-mapped population out to its file."""
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def state(self) -> dict:
+        """A copy of every person's status and duration, for checkpoint."""
+        return {'status': self._status.copy(),
+                'infection_duration': self._infection_duration.copy()}
+
+    def restore(self, state) -> None:
+        """Go back to a state(), without telling listeners."""
+        self._status[:] = state['status']
+        self._infection_duration[:] = state['infection_duration']
+        self._counts[:] = np.bincount(self._status.view(np.uint8), minlength=len(Status))
+
+    def __len__(self) -> int:
+        return len(self._status)
+
+    def data(self):
+        # Read-only so that all changes go through the transitions below.
+        view = self._status.view()
+        view.flags.writeable = False
+        return view
+
+    def infection_duration(self):
+        view = self._infection_duration.view()
+        view.flags.writeable = False
+        return view
+
+    def status(self, index) -> Status:
+        return Status(self._status[index])
+
+    def add_listener(self, listener) -> None:
+        """
+        listener(index, old, status) is called after every transition with
+        the array of people moved, their previous status values and the
+        Status they moved to.
+        """
+        self._listeners.append(listener)
+
+    def _set_status(self, index, status:Status) -> None:
+        if self._listeners:
+            index = np.asarray(index)
+            if index.dtype == bool:
+                index = np.flatnonzero(index)
+            index = index.ravel()
+        old = self._status[index]
+        counts = np.bincount(old.ravel(), minlength=len(Status))
+        self._counts -= counts
+        self._counts[status.value] += counts.sum()
+        self._status[index] = status.value
+        for listener in self._listeners:
+            listener(index, old, status)
+
+    def infect(self, index) -> None:
+        self._set_status(index, Status.INFECTIOUS)
+        self._infection_duration[index] = 0
+
+    def infection_incr(self, index=None) -> None:
+        if index is None:
+            index = self._status == Status.INFECTIOUS.value
+        self._infection_duration[index] += 1
+
+    def recover(self, index) -> None:
+        self._set_status(index, Status.RECOVERED)
+
+    def vaccinate(self, index) -> None:
+        self._set_status(index, Status.VACCINATED)
+
+    def count_status(self, status:Status, data=None) -> int:
+        if data is None:
+            return int(self._counts[status.value])
+        return int(np.count_nonzero(data == status.value))
+    
+    def num_vulnerable(self,data=None):
+        return self.count_status(Status.VULNERABLE,data)
+
+    def num_infectious(self,data=None):
+        return self.count_status(Status.INFECTIOUS,data)
+
+    def num_recovered(self,data=None):
+        return self.count_status(Status.RECOVERED,data)
+
+    def num_vaccinated(self,data=None):
+        return self.count_status(Status.VACCINATED,data)
+
+
+class SimpleModel():
+
+    def __init__(self, pop:Population, rng=None) -> None:
+        self._pop = pop
+        # A numpy Generator, so runs can be seeded independently.
+        self._rng = np.random.default_rng(rng)
+
+    def infect(self, number=1) -> None:
+        vulnerable = np.flatnonzero(self._pop.data() == Status.VULNERABLE.value)
+        if not 0 <= number <= len(vulnerable):
+            raise ValueError('cannot infect {} of {} vulnerable people'.format(number, len(vulnerable)))
+        victims = self._rng.choice(vulnerable, size=number, replace=False)
+        self._pop.infect(victims)
+
+    def vaccinate(self, fraction) -> None:
+        """Vaccinate a random fraction of the population, from the vulnerable."""
+        if not 0 <= fraction <= 1:
+            raise ValueError('cannot vaccinate a fraction {} of the population'.format(fraction))
+        vulnerable = np.flatnonzero(self._pop.data() == Status.VULNERABLE.value)
+        number = min(round(fraction * len(self._pop)), len(vulnerable))
+        self._pop.vaccinate(self._rng.choice(vulnerable, size=number, replace=False))
+
+    def state(self) -> dict:
+        return {'rng': self._rng.bit_generator.state}
+
+    def restore(self, state) -> None:
+        self._rng.bit_generator.state = state['rng']
+
+    def spread(self, cell_size=3) -> None:
+        if cell_size < 1:
+            raise ValueError('cell_size must be at least 1, not {}'.format(cell_size))
+        # Shuffle everyone into cells of cell_size; anyone left over past
+        # the last full cell sits this step out.
+        order = self._rng.permutation(len(self._pop))
+        num_cells = len(order)//cell_size
+        cells = order[:num_cells*cell_size].reshape(num_cells, cell_size)
+        status = self._pop.data()[cells]
+        infected = (status == Status.INFECTIOUS.value).any(axis=1)
+        # In every cell with someone infectious, infect all the vulnerable
+        # and the infectious recover.
+        members = cells[infected].ravel()
+        status = status[infected].ravel()
+        self._pop.recover(members[status == Status.INFECTIOUS.value])
+        self._pop.infect(members[status == Status.VULNERABLE.value])
+
+
+class IndexSet():
+    """
+    A set of person indices with O(1) add and remove per member, and
+    random draws without a scan.  Members are packed at the front of a
+    dense array, and pos records where each index sits in it (-1 when
+    absent).  Sets whose members never overlap can share one pos array.
+    """
+    def __init__(self, capacity, pos) -> None:
+        self._dense = np.empty(capacity, dtype=pos.dtype)
+        self._pos = pos
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def members(self):
+        return self._dense[:self._len]
+
+    def add(self, index) -> None:
+        end = self._len + len(index)
+        self._dense[self._len:end] = index
+        self._pos[index] = np.arange(self._len, end)
+        self._len = end
+
+    def remove(self, index) -> None:
+        if len(index) == 0:
+            return
+        where = self._pos[index]
+        self._pos[index] = -1
+        end = self._len - len(index)
+        # Members still in the tail fill the holes left in the front.
+        tail = self._dense[end:self._len]
+        keep = tail[self._pos[tail] >= 0]
+        holes = where[where < end]
+        self._dense[holes] = keep
+        self._pos[keep] = holes
+        self._len = end
+
+    def draw(self, number, rng):
+        """number members chosen at random, without removing them."""
+        number = min(number, self._len)
+        return self._dense[rng.choice(self._len, size=number, replace=False)]
+
+    def state(self):
+        """The members in their order, which draw() depends on."""
+        return self.members().copy()
+
+    def restore(self, members) -> None:
+        """Go back to a state(); pos must be restored separately."""
+        self._len = len(members)
+        self._dense[:self._len] = members
+
+
+class Campaign():
+    """
+    Vaccinates up to capacity people a day from start_day onwards.
+
+    priority is a list of index arrays, highest priority first; each tier
+    is exhausted before the next is started, and people in no tier are
+    never vaccinated.  Tiers may overlap: anyone listed more than once is
+    only in the first tier that lists them.  By default everyone is in a
+    single tier.  Within a tier, eligible people are taken from each of
+    statuses in turn.
+
+    Eligible people are kept in an IndexSet per tier and status, updated
+    as the population moves between states, so a day's doses cost
+    O(doses) rather than a scan of the population.
+    """
+    def __init__(self, pop:Population, capacity, start_day=0, priority=None,
+                 statuses=(Status.VULNERABLE, Status.RECOVERED), rng=None) -> None:
+        self._pop = pop
+        self.capacity = capacity
+        self.start_day = start_day
+        self.day = 0
+        self._rng = np.random.default_rng(rng)
+
+        if priority is None:
+            priority = [np.arange(len(pop))]
+        self._tier = np.full(len(pop), -1, dtype=np.int16)
+        pos = np.full(len(pop), -1, dtype=np.int32 if len(pop) < 2**31 else np.int64)
+        self._pos = pos
+        self._sets = []
+        for tier, members in enumerate(priority):
+            members = np.asarray(members)
+            # Drop repeats, keeping the order given, and anyone in an
+            # earlier tier, as the tiers share pos.
+            _, first = np.unique(members, return_index=True)
+            members = members[np.sort(first)]
+            members = members[self._tier[members] < 0]
+            self._tier[members] = tier
+            sets = {}
+            for status in statuses:
+                sets[status] = IndexSet(len(members), pos)
+                sets[status].add(members[pop.data()[members] == status.value])
+            self._sets.append(sets)
+        pop.add_listener(self._moved)
+
+    def _moved(self, index, old, status:Status) -> None:
+        tier = self._tier[index]
+        changed = (tier >= 0) & (old != status.value)
+        for t, sets in enumerate(self._sets):
+            in_tier = changed & (tier == t)
+            for s, members in sets.items():
+                members.remove(index[in_tier & (old == s.value)])
+            if status in sets:
+                sets[status].add(index[in_tier])
+
+    def state(self) -> dict:
+        state = {'day': self.day, 'rng': self._rng.bit_generator.state, 'pos': self._pos.copy()}
+        for tier, sets in enumerate(self._sets):
+            for status, members in sets.items():
+                state['{}_{}'.format(tier, status.name.lower())] = members.state()
+        return state
+
+    def restore(self, state) -> None:
+        """Go back to a state() of a Campaign made with the same arguments."""
+        self.day = state['day']
+        self._rng.bit_generator.state = state['rng']
+        self._pos[:] = state['pos']
+        for tier, sets in enumerate(self._sets):
+            for status, members in sets.items():
+                members.restore(state['{}_{}'.format(tier, status.name.lower())])
+
+    def num_eligible(self) -> int:
+        return sum(len(m) for sets in self._sets for m in sets.values())
+
+    def step(self) -> int:
+        """Run one day of the campaign, returning the doses given."""
+        day = self.day
+        self.day += 1
+        if day < self.start_day:
+            return 0
+        doses = 0
+        for sets in self._sets:
+            for members in sets.values():
+                if doses == self.capacity:
+                    return doses
+                chosen = members.draw(self.capacity - doses, self._rng)
+                self._pop.vaccinate(chosen)
+                doses += len(chosen)
+        return doses
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Spread through random cells, with an optional vaccination campaign.')
+    parser.add_argument('--population', type=int, default=100)
+    parser.add_argument('--cell-size', type=int, default=3)
+    parser.add_argument('--steps', type=int, default=10)
+    parser.add_argument('--initial', type=int, default=1, help='people infected at the start')
+    parser.add_argument('--doses', type=int, default=5, help='vaccinations per step')
+    parser.add_argument('--start', type=int, default=3, help='step the vaccination campaign starts')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--mmap', metavar='PATH', help='keep the population in this file, see Population')
+    parser.add_argument('--checkpoint', metavar='PATH', help='save the run here every --every steps')
+    parser.add_argument('--every', type=int, default=100, help='steps between checkpoints')
+    parser.add_argument('--resume', action='store_true', help='carry on from the checkpoint')
+    args = parser.parse_args(argv)
+    if args.resume and not args.checkpoint:
+        parser.error('--resume needs --checkpoint')
+    if args.cell_size < 1:
+        parser.error('--cell-size must be at least 1')
+    if not 0 <= args.initial <= args.population:
+        parser.error('--initial must be between 0 and --population')
+
+    rng = np.random.default_rng(args.seed)
+    a = Population(args.population, args.mmap)
+    m = SimpleModel(a, rng)
+    c = Campaign(a, capacity=args.doses, start_day=args.start, rng=rng)
+    print("step", *(s.name.lower() for s in Status), sep='\t')
+    first = 0
+    if args.resume:
+        state = checkpoint.load(args.checkpoint)
+        a.restore(state['population'])
+        m.restore(state['model'])
+        c.restore(state['campaign'])
+        first = state['step']
+    else:
+        m.infect(args.initial)
+        print(0, *(a.count_status(s) for s in Status), sep='\t')
+
+    checkpointer = checkpoint.Checkpointer(args.checkpoint, args.every) if args.checkpoint else None
+    for i in range(first, args.steps):
+        m.spread(args.cell_size)
+        c.step()
+        print(i+1, *(a.count_status(s) for s in Status), sep='\t')
+        if checkpointer:
+            checkpointer.maybe(i+1, lambda: {'step': i+1, 'population': a.state(),
+                                              'model': m.state(), 'campaign': c.state()})
+    if checkpointer:
+        checkpointer.close()
+
+
+if __name__ == '__main__':
+    main()
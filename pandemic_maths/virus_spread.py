@@ -0,0 +1,235 @@
+"""
+Bouncing balls represent population. 
+Blue - not infected
+Red - infectious
+Green - infected but no longer infectious.
+
+
+The simulation itself; the arcade window is in virus_spread_arcade so
+this can be used without a display.
+"""
+
+import argparse
+
+import numpy as np
+
+from . import checkpoint
+from .spatial import grid_pairs
+
+# --- Set up the constants
+
+# Size of the screen
+SCREEN_WIDTH = 1200
+SCREEN_HEIGHT = 600
+# Size of popultion window
+WINDOW_WIDTH = 600
+WINDOW_HEIGHT = 600
+
+
+from enum import Enum
+
+class Status(Enum):
+    VULNERABLE = 0
+    INFECTIOUS = 1
+    IMMUNE = 2
+
+class Speed(Enum):
+    SLOW = 0
+    NORMAL = 1
+    FAST = 2
+    
+DEFAULT_SPEED = Speed.NORMAL
+
+# Choices of velocity on each axis for each speed.
+VELOCITIES = {
+    Speed.SLOW: [-1, -0.5, 0.5, 1],
+    Speed.NORMAL: [-2, -0.5, 0.5, 2],
+    Speed.FAST: [-2.5, -0.75, 0.75, 2.5],
+}
+
+# Steps a ball stays infectious.
+INFECTIOUS_STEPS = 130
+
+INFECTIOUS = Status.INFECTIOUS.value
+
+class BallWorld:
+    """
+    The balls bouncing around a width x height box, stepped without any
+    window.  The first `infected` balls start infectious.
+
+    Each ball's state is an entry in parallel arrays: position x, y,
+    velocity change_x, change_y, radius size, status (a Status value),
+    steps left infectious, and shade, the brightness of its colour.
+    """
+    def __init__(self, size=100, infected=1, width=WINDOW_WIDTH, height=WINDOW_HEIGHT, seed=None, ball_size=10):
+        if not 0 <= infected <= size:
+            raise ValueError('cannot infect {} of {} balls'.format(infected, size))
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+        self.steps = 0
+
+        self.size = np.full(size, ball_size, dtype=float)
+        # Take into account the ball size so we don't spawn on the edge.
+        self.x = self.rng.integers(ball_size, width - ball_size, size).astype(float)
+        self.y = self.rng.integers(ball_size, height - ball_size, size).astype(float)
+        self.change_x = np.zeros(size)
+        self.change_y = np.zeros(size)
+        self.speed(DEFAULT_SPEED)
+        self.status = np.full(size, Status.VULNERABLE.value, dtype=np.int8)
+        self.infectious = np.zeros(size, dtype=np.int16)
+        self.shade = self.rng.integers(128, 256, size, dtype=np.uint8)
+        self.infect(np.arange(infected))
+
+    def __len__(self):
+        return len(self.x)
+
+    def count_status(self, status:Status) -> int:
+        return int(np.count_nonzero(self.status == status.value))
+
+    def infect(self, index):
+        """
+        Infect those of the balls at index that are vulnerable, and
+        return their indices.
+        """
+        index = np.atleast_1d(index)
+        index = index[self.status[index] == Status.VULNERABLE.value]
+        self.status[index] = Status.INFECTIOUS.value
+        self.infectious[index] = INFECTIOUS_STEPS
+        self.shade[index] = self.rng.integers(128, 256, len(index))
+        return index
+
+    def immune(self, index):
+        index = np.atleast_1d(index)
+        self.status[index] = Status.IMMUNE.value
+        self.shade[index] = self.rng.integers(128, 256, len(index))
+
+    def speed(self, value:Speed, index=slice(None)):
+        n = len(self.x[index])
+        self.change_x[index] = self.rng.choice(VELOCITIES[value], n)
+        self.change_y[index] = self.rng.choice(VELOCITIES[value], n)
+
+    def colors(self):
+        """RGB for every ball: blue vulnerable, red infectious, green immune."""
+        channel = np.array([2, 0, 1])[self.status]
+        colors = np.zeros((len(self), 3), dtype=np.uint8)
+        colors[np.arange(len(self)), channel] = self.shade
+        return colors
+
+    def contact(self, ball, other):
+        """Two balls meet: they swap velocities and infect each other."""
+        change_x = self.change_x
+        change_y = self.change_y
+        change_x[ball], change_x[other] = change_x[other], change_x[ball]
+        change_y[ball], change_y[other] = change_y[other], change_y[ball]
+        if self.status[ball] == INFECTIOUS:
+            self.infect(other)
+        if self.status[other] == INFECTIOUS:
+            self.infect(ball)
+
+    # Per-ball arrays, in the order state() saves them.
+    ARRAYS = ('x', 'y', 'change_x', 'change_y', 'size', 'status', 'infectious', 'shade')
+
+    def state(self):
+        """A copy of the whole world, for checkpoint."""
+        state = {name: getattr(self, name).copy() for name in self.ARRAYS}
+        state.update(steps=self.steps, width=self.width, height=self.height,
+                     rng=self.rng.bit_generator.state)
+        return state
+
+    def restore(self, state):
+        """Go back to a state()."""
+        for name in self.ARRAYS:
+            setattr(self, name, state[name].copy())
+        self.steps = state['steps']
+        self.width = state['width']
+        self.height = state['height']
+        self.rng.bit_generator.state = state['rng']
+
+    def step(self, n=1):
+        """ Movement and infection for n steps """
+        for i in range(n):
+            self._step()
+        self.steps += n
+
+    def _step(self):
+        self.x += self.change_x
+        self.y += self.change_y
+
+        infectious = self.status == Status.INFECTIOUS.value
+        self.infectious[infectious] -= 1
+        self.immune(np.flatnonzero(infectious & (self.infectious == 0)))
+
+        # Collision with walls
+        self.change_x[self.x < self.size] *= -1
+        self.change_y[self.y < self.size] *= -1
+        self.change_x[self.x > self.width - self.size] *= -1
+        self.change_y[self.y > self.height - self.size] *= -1
+
+        self._collide()
+
+    def _collide(self):
+        """
+        Balls within size of each other on both axes swap velocities, and
+        infect each other.  Each ball, in order, takes the first such
+        ball not already hit this step.
+        """
+        first, second = grid_pairs(self.x, self.y, self.size.max(initial=0))
+        size = self.size[first]
+        touching = ((np.abs(self.x[first] - self.x[second]) < size)
+                    & (np.abs(self.y[first] - self.y[second]) < size))
+
+        hit = set()
+        last = -1
+        for ball, other in zip(first[touching].tolist(), second[touching].tolist()):
+            if ball == last or other in hit:
+                continue
+            self.contact(ball, other)
+            hit.add(ball)
+            hit.add(other)
+            last = ball
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Bouncing balls without a window.')
+    parser.add_argument('--balls', type=int, default=100)
+    parser.add_argument('--infected', type=int, default=1, help='balls infectious at the start')
+    parser.add_argument('--width', type=int, default=WINDOW_WIDTH)
+    parser.add_argument('--height', type=int, default=WINDOW_HEIGHT)
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--report', type=int, default=50, help='steps between reports')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--engine', choices=['step', 'event'], default='step',
+                        help='fixed steps with overlap tests, or exact event times')
+    parser.add_argument('--checkpoint', metavar='PATH', help='save the run here every --every steps')
+    parser.add_argument('--every', type=int, default=1000, help='steps between checkpoints, a multiple of --report')
+    parser.add_argument('--resume', action='store_true', help='carry on from the checkpoint')
+    args = parser.parse_args(argv)
+    if args.resume and not args.checkpoint:
+        parser.error('--resume needs --checkpoint')
+    if args.checkpoint and (args.every < 1 or args.every % args.report):
+        parser.error('--every must be a multiple of --report')
+    if not 0 <= args.infected <= args.balls:
+        parser.error('--infected must be between 0 and --balls')
+
+    if args.engine == 'event':
+        from .events import EventWorld as World
+    else:
+        World = BallWorld
+    world = World(args.balls, args.infected, args.width, args.height, args.seed)
+    if args.resume:
+        world.restore(checkpoint.load(args.checkpoint)['world'])
+    checkpointer = checkpoint.Checkpointer(args.checkpoint, args.every) if args.checkpoint else None
+    print("step", *(s.name.lower() for s in Status), sep='\t')
+    while True:
+        print(world.steps, *(world.count_status(s) for s in Status), sep='\t')
+        if checkpointer:
+            checkpointer.maybe(world.steps, lambda: {'world': world.state()})
+        if world.steps >= args.steps:
+            break
+        world.step(min(args.report, args.steps - world.steps))
+    if checkpointer:
+        checkpointer.close()
+
+if __name__ == "__main__":
+    main()
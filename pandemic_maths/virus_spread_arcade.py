@@ -0,0 +1,321 @@
+"""
+Arcade window for the bouncing ball model in virus_spread.
+"""
+
+import argparse
+import time
+
+import arcade
+import numpy as np
+from arcade.gl import BufferDescription
+from arcade.gui import UIManager
+
+from . import checkpoint
+from .chart import Chart
+from .events import EventWorld
+from .growth import StreamingGrowth, doubling_time
+from .virus_spread import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, WINDOW_WIDTH, WINDOW_HEIGHT,
+    Status, Speed, BallWorld,
+)
+
+# Simulation steps per second at normal speed, and the most steps run
+# in one frame before the simulation is allowed to fall behind.
+STEPS_PER_SECOND = 60
+MAX_STEPS_PER_FRAME = 2000
+# Seconds of each frame spent stepping when fast forwarding.
+FAST_FORWARD_TIME = 0.1
+# The doubling time shown is fitted to the infected count every
+# GROWTH_INTERVAL steps over the last GROWTH_WINDOW of those counts.
+GROWTH_INTERVAL = 10
+GROWTH_WINDOW = 10
+
+# The chart to the right of the balls, one column per pixel.
+CHART_LEFT = 5 + WINDOW_WIDTH
+CHART_WIDTH = SCREEN_WIDTH - CHART_LEFT - 5
+CHART_HEIGHT = WINDOW_HEIGHT
+
+CHART_VERTEX_SHADER = """
+#version 330
+// Vertices are (column, value); origin and scale place them in the
+// window, in pixels.
+uniform vec2 origin;
+uniform vec2 scale;
+uniform vec2 screen;
+in vec2 in_vert;
+void main() {
+    vec2 pos = origin + in_vert * scale;
+    gl_Position = vec4(pos / screen * 2.0 - 1.0, 0.0, 1.0);
+}
+"""
+
+CHART_FRAGMENT_SHADER = """
+#version 330
+uniform vec3 color;
+out vec4 out_color;
+void main() {
+    out_color = vec4(color, 1.0);
+}
+"""
+
+class ChartRenderer:
+    """
+    Draws each series of a Chart as a line strip from its own GPU buffer.
+    Only the columns changed since the last frame are sent, so drawing
+    costs the same however long the run has gone on.
+    """
+    def __init__(self, window, chart, colors, origin, size, top):
+        self.window = window
+        self.chart = chart
+        self.colors = [tuple(c / 255 for c in color[:3]) for color in colors]
+        ctx = window.ctx
+        self.program = ctx.program(vertex_shader=CHART_VERTEX_SHADER,
+                                   fragment_shader=CHART_FRAGMENT_SHADER)
+        self.program['origin'] = origin
+        self.program['scale'] = (size[0] / chart.columns, size[1] / top)
+        # Two vertices of two floats for each column.
+        self.buffers = [ctx.buffer(reserve=chart.columns * 16) for color in colors]
+        self.geometries = [ctx.geometry([BufferDescription(buffer, '2f', ['in_vert'])], mode=ctx.LINE_STRIP)
+                           for buffer in self.buffers]
+
+    def draw(self):
+        first, end = self.chart.changed()
+        if end > first:
+            for series, buffer in enumerate(self.buffers):
+                buffer.write(self.chart.vertices(series, first, end).tobytes(), offset=first * 16)
+        self.program['screen'] = self.window.get_size()
+        for color, geometry in zip(self.colors, self.geometries):
+            self.program['color'] = color
+            geometry.render(self.program, vertices=2 * self.chart.used)
+
+BALL_VERTEX_SHADER = """
+#version 330
+// One point per ball: x, y and radius in pixels, and its colour.
+uniform vec2 screen;
+uniform float pixel_ratio;
+in vec3 in_ball;
+in vec3 in_color;
+out vec3 color;
+void main() {
+    gl_Position = vec4(in_ball.xy / screen * 2.0 - 1.0, 0.0, 1.0);
+    gl_PointSize = 2.0 * in_ball.z * pixel_ratio;
+    color = in_color;
+}
+"""
+
+BALL_FRAGMENT_SHADER = """
+#version 330
+in vec3 color;
+out vec4 out_color;
+void main() {
+    // Round off the square point.
+    if (length(gl_PointCoord - vec2(0.5)) > 0.5)
+        discard;
+    out_color = vec4(color, 1.0);
+}
+"""
+
+class BallRenderer:
+    """
+    Draws every ball of a BallWorld in one draw call, as points sized by
+    the shader.  Positions and colours are sent in bulk each frame.
+    """
+    def __init__(self, window, world):
+        self.window = window
+        self.world = world
+        ctx = window.ctx
+        self.program = ctx.program(vertex_shader=BALL_VERTEX_SHADER,
+                                   fragment_shader=BALL_FRAGMENT_SHADER)
+        # x, y and radius as floats, colour as normalised bytes.
+        self.balls = ctx.buffer(reserve=len(world) * 12)
+        self.colors = ctx.buffer(reserve=len(world) * 3)
+        self.geometry = ctx.geometry([BufferDescription(self.balls, '3f', ['in_ball']),
+                                      BufferDescription(self.colors, '3f1', ['in_color'], normalized=['in_color'])],
+                                     mode=ctx.POINTS)
+
+    def draw(self):
+        world = self.world
+        balls = np.empty((len(world), 3), dtype=np.float32)
+        balls[:, 0] = world.x
+        balls[:, 1] = world.y
+        balls[:, 2] = world.size
+        self.balls.write(balls.tobytes())
+        self.colors.write(world.colors().tobytes())
+        self.program['screen'] = self.window.get_size()
+        self.program['pixel_ratio'] = self.window.get_pixel_ratio()
+        self.window.ctx.enable(self.window.ctx.PROGRAM_POINT_SIZE)
+        self.geometry.render(self.program, vertices=len(world))
+
+class FlatButton(arcade.gui.UIFlatButton):
+
+    def world(self, world):
+        self.ball_world = world
+
+    def on_click(self):
+        # This is how we lock down
+        self.ball_world.speed(Speed.SLOW)
+
+class MyGame(arcade.View):
+    """
+    Main application class.
+
+    The simulation runs at STEPS_PER_SECOND times speedup steps per
+    second of real time, however fast frames are drawn.  Keys: + and -
+    double and halve the speed, space pauses, F fast forwards to the end
+    of the epidemic without drawing the balls.
+    """
+
+    def __init__(self, world=None, speedup=1, checkpointer=None):
+        #super().__init__(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+        super().__init__()
+        self.ui_manager = UIManager()
+        self.world = world if world is not None else BallWorld()
+        self.speedup = speedup
+        self.paused = False
+        self.fast_forward = False
+        self._steps_due = 0.0
+        # Infected (red) and not infected (blue) at every step.
+        self.chart = Chart(CHART_WIDTH, series=2)
+        self.growth = StreamingGrowth(GROWTH_WINDOW)
+        self.checkpointer = checkpointer
+        self.chart_renderer = None
+        self.ball_renderer = None
+
+    def on_draw(self):
+        """
+        Render the screen.
+        """
+        # This command has to happen before we start drawing
+        arcade.start_render()
+
+        if not self.fast_forward:
+            self.ball_renderer.draw()
+
+        if self.chart.last is None:
+            return
+        self.chart_renderer.draw()
+
+        # Put the text on the screen.
+        output = "Infected: {}".format(int(self.chart.last[0]))
+        arcade.draw_text(output, 1000, 60, arcade.color.WHITE, 14)
+        # Only shown while growth is clear of noise.  The fit is per
+        # count, one every GROWTH_INTERVAL steps.
+        rate, low, high = self.growth.rate()
+        if low > 0:
+            doubling = doubling_time(rate) * GROWTH_INTERVAL
+            output = "Doubling: {:.0f} steps".format(doubling)
+            arcade.draw_text(output, 1000, 40, arcade.color.WHITE, 14)
+        if self.fast_forward:
+            state = "Fast forward"
+        elif self.paused:
+            state = "Paused"
+        else:
+            state = "Speed x{:g}".format(self.speedup)
+        output = "Step {}  {}".format(self.world.steps, state)
+        arcade.draw_text(output, 1000, 20, arcade.color.WHITE, 14)
+
+    def on_show_view(self):
+        """ Called once when view is activated. """
+        self.setup()
+        arcade.set_background_color(arcade.color.BLACK)
+
+    def setup(self):
+        """ Set up this view. """
+        """
+        self.ui_manager.purge_ui_elements()
+
+        button = FlatButton(
+            'Lockdown',
+            center_x=1000,
+            center_y=20,
+            width=250
+        )
+        button.world(self.world)
+        self.ui_manager.add_ui_element(button)
+        """
+        if self.ball_renderer is None:
+            self.ball_renderer = BallRenderer(self.window, self.world)
+        if self.chart_renderer is None:
+            self.chart_renderer = ChartRenderer(
+                self.window, self.chart, [arcade.color.RED, arcade.color.BLUE],
+                (CHART_LEFT, 0), (CHART_WIDTH, CHART_HEIGHT), len(self.world))
+
+    def state(self):
+        return {'world': self.world.state(), 'chart': self.chart.state(),
+                'growth': self.growth.state(), 'speedup': self.speedup}
+
+    def restore(self, state):
+        self.world.restore(state['world'])
+        self.chart.restore(state['chart'])
+        self.growth.restore(state['growth'])
+        self.speedup = state['speedup']
+
+    def on_key_press(self, key, modifiers):
+        if key in (arcade.key.PLUS, arcade.key.EQUAL, arcade.key.NUM_ADD):
+            self.speedup *= 2
+        elif key in (arcade.key.MINUS, arcade.key.NUM_SUBTRACT):
+            self.speedup /= 2
+        elif key == arcade.key.SPACE:
+            self.paused = not self.paused
+        elif key == arcade.key.F:
+            self.fast_forward = not self.fast_forward
+
+    def advance(self, steps):
+        """ Movement and game logic, charting every step """
+        for i in range(steps):
+            vulnerable = self.world.count_status(Status.VULNERABLE)
+            self.chart.append([len(self.world) - vulnerable, vulnerable])
+            if self.world.steps % GROWTH_INTERVAL == 0:
+                self.growth.update(len(self.world) - vulnerable)
+            self.world.step()
+            if self.checkpointer:
+                self.checkpointer.maybe(self.world.steps, self.state)
+
+    def on_update(self, delta_time):
+        if self.fast_forward:
+            # As many steps as fit in the frame, until nobody is infectious.
+            stop = time.perf_counter() + FAST_FORWARD_TIME
+            while time.perf_counter() < stop:
+                if self.world.count_status(Status.INFECTIOUS) == 0:
+                    self.fast_forward = False
+                    break
+                self.advance(10)
+            return
+        if self.paused:
+            return
+        self._steps_due += delta_time * STEPS_PER_SECOND * self.speedup
+        steps = min(int(self._steps_due), MAX_STEPS_PER_FRAME)
+        self._steps_due = min(self._steps_due - steps, 1.0)
+        self.advance(steps)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Bouncing balls in an arcade window.')
+    parser.add_argument('--balls', type=int, default=100)
+    parser.add_argument('--infected', type=int, default=1, help='balls infectious at the start')
+    parser.add_argument('--speed', type=float, default=1, help='simulation speed, x normal')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--engine', choices=['step', 'event'], default='step',
+                        help='fixed steps with overlap tests, or exact event times')
+    parser.add_argument('--checkpoint', metavar='PATH', help='save the run here every --every steps')
+    parser.add_argument('--every', type=int, default=1000, help='steps between checkpoints')
+    parser.add_argument('--resume', action='store_true', help='carry on from the checkpoint')
+    args = parser.parse_args(argv)
+    if args.resume and not args.checkpoint:
+        parser.error('--resume needs --checkpoint')
+    if not 0 <= args.infected <= args.balls:
+        parser.error('--infected must be between 0 and --balls')
+    World = EventWorld if args.engine == 'event' else BallWorld
+
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, 'Pandemic')
+    checkpointer = checkpoint.Checkpointer(args.checkpoint, args.every) if args.checkpoint else None
+    view = MyGame(World(args.balls, args.infected, seed=args.seed), args.speed, checkpointer)
+    if args.resume:
+        view.restore(checkpoint.load(args.checkpoint))
+    window.show_view(view)
+    arcade.run()
+    if checkpointer:
+        checkpointer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import stat
+
+import numpy as np
+import pytest
+
+from pandemic_maths import checkpoint, vaccination_model, virus_spread
+from pandemic_maths.events import EventWorld
+from pandemic_maths.virus_spread import BallWorld
+
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / 'state.npz'
+    state = {'step': 3, 'x': np.arange(5.0), 'nested': {'rng': np.random.default_rng(1).bit_generator.state,
+                                                          'flags': np.array([True, False])}}
+    checkpoint.save(path, state)
+    loaded = checkpoint.load(path)
+    assert loaded['step'] == 3
+    np.testing.assert_array_equal(loaded['x'], state['x'])
+    np.testing.assert_array_equal(loaded['nested']['flags'], state['nested']['flags'])
+    assert loaded['nested']['rng'] == state['nested']['rng']
+    # Nothing left behind but the checkpoint.
+    assert os.listdir(tmp_path) == ['state.npz']
+
+
+def test_save_follows_umask(tmp_path):
+    mask = os.umask(0o027)
+    try:
+        checkpoint.save(tmp_path / 'state.npz', {'step': 1})
+    finally:
+        os.umask(mask)
+    assert stat.S_IMODE(os.stat(tmp_path / 'state.npz').st_mode) == 0o640
+
+
+def test_checkpointer_every(tmp_path):
+    path = tmp_path / 'state.npz'
+    checkpointer = checkpoint.Checkpointer(path, every=4)
+    for step in range(1, 11):
+        checkpointer.maybe(step, lambda: {'step': step})
+    checkpointer.close()
+    assert checkpoint.load(path)['step'] == 8
+
+
+def run(main, argv, capsys):
+    main(argv)
+    return capsys.readouterr().out.splitlines()
+
+
+def test_vaccination_resume(tmp_path, capsys):
+    path = str(tmp_path / 'run.npz')
+    options = ['--population', '20000', '--steps', '30', '--seed', '1']
+    straight = run(vaccination_model.main, options, capsys)
+    # As if it had crashed after step 16.
+    first = run(vaccination_model.main, ['--population', '20000', '--steps', '16', '--seed', '1',
+                                         '--checkpoint', path, '--every', '8'], capsys)
+    resumed = run(vaccination_model.main, options + ['--checkpoint', path, '--resume'], capsys)
+    assert first + resumed[1:] == straight
+
+
+@pytest.mark.parametrize('engine', ['step', 'event'])
+def test_balls_resume(tmp_path, capsys, engine):
+    path = str(tmp_path / 'run.npz')
+    options = ['--balls', '150', '--steps', '900', '--report', '100', '--seed', '2', '--engine', engine]
+    straight = run(virus_spread.main, options, capsys)
+    first = run(virus_spread.main, ['--balls', '150', '--steps', '400', '--report', '100', '--seed', '2',
+                                    '--engine', engine, '--checkpoint', path, '--every', '200'], capsys)
+    resumed = run(virus_spread.main, options + ['--checkpoint', path, '--resume'], capsys)
+    assert first + resumed[2:] == straight
+
+
+@pytest.mark.parametrize('World', [BallWorld, EventWorld])
+def test_world_resume(tmp_path, World):
+    straight = World(200, 3, seed=4)
+    straight.step(700)
+    checkpoint.save(tmp_path / 'world.npz', {'world': straight.state()})
+    straight.step(900)
+    # A world made with other arguments takes on the saved one.
+    resumed = World(200, 3, seed=77)
+    resumed.restore(checkpoint.load(tmp_path / 'world.npz')['world'])
+    resumed.step(900)
+    assert resumed.steps == straight.steps
+    for name in World.ARRAYS:
+        np.testing.assert_array_equal(getattr(resumed, name), getattr(straight, name))
+
+
+def test_resume_needs_checkpoint(capsys):
+    with pytest.raises(SystemExit):
+        vaccination_model.main(['--resume'])
+    with pytest.raises(SystemExit):
+        virus_spread.main(['--resume'])
@@ -0,0 +1,57 @@
+import os
+import random
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_LOG_MODE', 'PYTHON')
+pytest.importorskip('kivy')
+
+from kivy.core.window import Window  # noqa: E402
+
+from pandemic_maths import checkpoint, infection_sim  # noqa: E402
+from pandemic_maths.timeseries import read_timeseries  # noqa: E402
+
+
+def run(ticks, **kwargs):
+    arena = infection_sim.Arena(**kwargs)
+    Window.add_widget(arena)
+    try:
+        for tick in range(ticks):
+            arena.update(1 / 60)
+        return [(person.x, person.y, person.change_x, person.change_y, person.infected, person.recovered)
+                for person in arena.population]
+    finally:
+        arena.stop()
+        Window.remove_widget(arena)
+
+
+def test_arena_resume(tmp_path):
+    random.seed(3)
+    straight = run(500, series_path=tmp_path / 'straight.pmts')
+    random.seed(3)
+    run(250, series_path=tmp_path / 'resumed.pmts',
+        checkpointer=checkpoint.Checkpointer(tmp_path / 'run.npz', 150))
+    resumed = run(350, series_path=tmp_path / 'resumed.pmts', state=checkpoint.load(tmp_path / 'run.npz'))
+    assert resumed == straight
+    straight_series = read_timeseries(tmp_path / 'straight.pmts')
+    resumed_series = read_timeseries(tmp_path / 'resumed.pmts')
+    assert len(resumed_series['tick']) == 501
+    assert resumed_series == straight_series
+
+
+def test_series_survives_a_crash(tmp_path):
+    # The series is synced at each checkpoint, so a crash (no stop())
+    # after one still leaves every row up to it.
+    random.seed(5)
+    arena = infection_sim.Arena(series_path=tmp_path / 'series.pmts',
+                                checkpointer=checkpoint.Checkpointer(tmp_path / 'run.npz', 100))
+    Window.add_widget(arena)
+    for tick in range(150):
+        arena.update(1 / 60)
+    arena.checkpointer.close()
+    infection_sim.Clock.unschedule(arena.sched_update)
+    Window.remove_widget(arena)
+    run(10, series_path=tmp_path / 'series.pmts', state=checkpoint.load(tmp_path / 'run.npz'))
+    assert list(read_timeseries(tmp_path / 'series.pmts')['tick']) == list(range(111))
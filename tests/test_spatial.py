@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from pandemic_maths.spatial import grid_pairs
+
+
+def brute_force_pairs(x, y, cell_size):
+    close = (np.abs(x[:, None] - x[None, :]) < cell_size) & (np.abs(y[:, None] - y[None, :]) < cell_size)
+    np.fill_diagonal(close, False)
+    return np.nonzero(close)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('cell_size', [1.0, 7.5, 40.0])
+def test_grid_pairs_matches_brute_force(seed, cell_size):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(-50, 200, 300)
+    y = rng.uniform(0, 100, 300)
+    # Points exactly on cell edges and on top of each other.
+    x[:20] = np.round(x[:20] / cell_size) * cell_size
+    x[20:25] = x[25:30]
+    y[20:25] = y[25:30]
+    first, second = grid_pairs(x, y, cell_size)
+    expected = brute_force_pairs(x, y, cell_size)
+    np.testing.assert_array_equal(first, expected[0])
+    np.testing.assert_array_equal(second, expected[1])
+
+
+def test_grid_pairs_no_points():
+    first, second = grid_pairs(np.empty(0), np.empty(0), 10)
+    assert len(first) == len(second) == 0
+
+
+def test_grid_pairs_one_point():
+    first, second = grid_pairs(np.array([3.0]), np.array([4.0]), 10)
+    assert len(first) == len(second) == 0
@@ -0,0 +1,60 @@
+import pytest
+
+from pandemic_maths.timeseries import TimeSeriesWriter, read_timeseries
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'series.pmts'
+    with TimeSeriesWriter(path, ['tick', 'count'], block_rows=7) as series:
+        for tick in range(100):
+            series.append(tick, tick * tick)
+    columns = read_timeseries(path)
+    assert list(columns) == ['tick', 'count']
+    assert list(columns['tick']) == list(range(100))
+    assert list(columns['count']) == [tick * tick for tick in range(100)]
+
+
+@pytest.mark.parametrize('keep', [0, 5, 7, 10, 1001])
+def test_keep_after_a_crash(tmp_path, keep):
+    path = tmp_path / 'series.pmts'
+    series = TimeSeriesWriter(path, ['tick'], block_rows=7)
+    for tick in range(keep + 1):
+        series.append(tick)
+    series.sync()
+    # Rows after the sync, some written and some not, are lost with the
+    # crash: the writer is never closed.
+    for tick in range(keep + 1, keep + 50):
+        series.append(tick)
+    series.sync()
+    with TimeSeriesWriter(path, ['tick'], block_rows=7, keep=keep) as resumed:
+        for tick in range(keep, keep + 20):
+            resumed.append(tick)
+    assert list(read_timeseries(path)['tick']) == list(range(keep + 20))
+
+
+def test_keep_more_rows_than_written(tmp_path):
+    path = tmp_path / 'series.pmts'
+    with TimeSeriesWriter(path, ['tick'], block_rows=7) as series:
+        for tick in range(10):
+            series.append(tick)
+    with pytest.raises(ValueError, match='10 rows'):
+        TimeSeriesWriter(path, ['tick'], keep=11)
+
+
+def test_keep_other_columns(tmp_path):
+    path = tmp_path / 'series.pmts'
+    TimeSeriesWriter(path, ['tick']).close()
+    with pytest.raises(ValueError):
+        TimeSeriesWriter(path, ['tick', 'count'], keep=0)
+
+
+def test_write_failure_is_raised(tmp_path):
+    series = TimeSeriesWriter(tmp_path / 'series.pmts', ['tick'], block_rows=2)
+    series._file.close()
+    for tick in range(5):
+        try:
+            series.append(tick)
+        except ValueError:
+            pass
+    with pytest.raises(ValueError):
+        series.close()
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from pandemic_maths.vaccination_model import Campaign, IndexSet, Population, SimpleModel, Status
+
+
+def check_index_set(members, expected, pos):
+    assert sorted(members.members().tolist()) == sorted(expected)
+    # Every member is where pos says, and nobody else has a place.
+    np.testing.assert_array_equal(pos[members.members()], np.arange(len(members)))
+    assert np.count_nonzero(pos >= 0) == len(expected)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_index_set_add_and_remove(seed):
+    rng = np.random.default_rng(seed)
+    pos = np.full(200, -1, dtype=np.int32)
+    members = IndexSet(200, pos)
+    expected = set()
+    for i in range(100):
+        outside = np.array(sorted(set(range(200)) - expected))
+        add = rng.choice(outside, size=min(len(outside), rng.integers(0, 20)), replace=False)
+        members.add(add)
+        expected.update(add.tolist())
+        inside = np.array(sorted(expected))
+        # Removals from the front, the tail and both at once.
+        remove = rng.choice(inside, size=rng.integers(0, len(inside) + 1), replace=False)
+        members.remove(remove)
+        expected.difference_update(remove.tolist())
+        check_index_set(members, expected, pos)
+
+
+def test_index_set_remove_everything_and_nothing():
+    pos = np.full(10, -1, dtype=np.int32)
+    members = IndexSet(10, pos)
+    members.add(np.arange(10))
+    members.remove(np.array([], dtype=int))
+    check_index_set(members, set(range(10)), pos)
+    members.remove(np.arange(10)[::-1])
+    check_index_set(members, set(), pos)
+
+
+def eligible(campaign):
+    return [{status: set(members.members().tolist()) for status, members in sets.items()}
+            for sets in campaign._sets]
+
+
+def expected_eligible(pop, tiers, statuses):
+    data = pop.data()
+    return [{status: {i for i in tier if data[i] == status.value} for status in statuses} for tier in tiers]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_campaign_eligibility_follows_status(seed):
+    rng = np.random.default_rng(seed)
+    pop = Population(500)
+    model = SimpleModel(pop, rng)
+    # Overlapping tiers, and a repeat: everyone is in the first tier
+    # listing them.
+    priority = [np.arange(0, 200), np.r_[np.arange(150, 350), 160, 400], np.arange(300, 450)]
+    tiers = [set(range(0, 200)), set(range(200, 350)) | {400}, set(range(350, 400)) | set(range(401, 450))]
+    statuses = (Status.VULNERABLE, Status.RECOVERED)
+    campaign = Campaign(pop, 7, start_day=2, priority=priority, rng=rng)
+    model.infect(5)
+    assert eligible(campaign) == expected_eligible(pop, tiers, statuses)
+    given = 0
+    for day in range(30):
+        model.spread(3)
+        given += campaign.step()
+        assert eligible(campaign) == expected_eligible(pop, tiers, statuses)
+        assert campaign.num_eligible() == sum(len(m) for sets in expected_eligible(pop, tiers, statuses)
+                                              for m in sets.values())
+    # Nobody is dosed twice.
+    assert pop.num_vaccinated() == given
+
+
+def test_campaign_exhausts_tiers_in_order():
+    pop = Population(20)
+    campaign = Campaign(pop, 5, priority=[np.arange(0, 10), np.arange(5, 15)], rng=1)
+    assert campaign.step() == 5
+    assert set(np.flatnonzero(pop.data() == Status.VACCINATED.value)) <= set(range(10))
+    for day in range(5):
+        campaign.step()
+    np.testing.assert_array_equal(np.flatnonzero(pop.data() == Status.VACCINATED.value), np.arange(15))
+
+
+def test_simple_model_rejects_impossible_requests():
+    model = SimpleModel(Population(10), 1)
+    with pytest.raises(ValueError):
+        model.infect(11)
+    with pytest.raises(ValueError):
+        model.spread(0)
+    with pytest.raises(ValueError):
+        model.vaccinate(1.5)
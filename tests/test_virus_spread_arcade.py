@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+pyglet = pytest.importorskip('pyglet')
+pyglet.options['headless'] = True
+arcade = pytest.importorskip('arcade')
+
+from pandemic_maths import checkpoint, virus_spread_arcade  # noqa: E402
+from pandemic_maths.events import EventWorld  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def window():
+    try:
+        window = arcade.Window(virus_spread_arcade.SCREEN_WIDTH, virus_spread_arcade.SCREEN_HEIGHT, 'Pandemic')
+    except Exception as e:
+        pytest.skip('no OpenGL context: {}'.format(e))
+    yield window
+    window.close()
+
+
+@pytest.mark.parametrize('World', [virus_spread_arcade.BallWorld, EventWorld])
+def test_game_resume(tmp_path, window, World):
+    path = tmp_path / 'run.npz'
+    checkpointer = checkpoint.Checkpointer(path, 250)
+    straight = virus_spread_arcade.MyGame(World(100, 3, seed=1), checkpointer=checkpointer)
+    window.show_view(straight)
+    straight.advance(300)
+    checkpointer.close()
+    straight.advance(400)
+
+    resumed = virus_spread_arcade.MyGame(World(100, 3, seed=9))
+    resumed.restore(checkpoint.load(path))
+    window.show_view(resumed)
+    resumed.advance(450)
+    resumed.on_draw()
+    assert resumed.world.steps == straight.world.steps
+    np.testing.assert_array_equal(resumed.world.x, straight.world.x)
+    np.testing.assert_array_equal(resumed.chart.low, straight.chart.low)
+    np.testing.assert_array_equal(resumed.chart.high, straight.chart.high)
+    np.testing.assert_array_equal(resumed.growth.rate(), straight.growth.rate())